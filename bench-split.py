@@ -0,0 +1,346 @@
+import os
+import sys
+import re
+import json
+import time
+import random
+import argparse
+import platform
+import tempfile
+import statistics
+import contextlib
+import subprocess
+import multiprocessing
+from io import StringIO
+
+import pikepdf
+
+try:
+    import resource
+except ImportError:  # Windows 上没有 resource 模块
+    resource = None
+
+ROOT_DIR = os.path.dirname(os.path.abspath(__file__))
+SPLIT_SCRIPT = os.path.join(ROOT_DIR, "pdf-split.py")
+
+# 启动用例：(名称, 解释器参数)。查看帮助和参数有误的调用不应导入 pikepdf
+STARTUP_CASES = [
+    ("python -c pass", ["-c", "pass"]),
+    ("import pdfsplit", ["-c", "import pdfsplit"]),
+    ("import pdfsplit.engine", ["-c", "import pdfsplit.engine"]),
+    ("import pdfsplit.gui", ["-c", "import pdfsplit.gui"]),
+    ("import pikepdf", ["-c", "import pikepdf"]),
+    ("pdf-split.py --help", [SPLIT_SCRIPT, "--help"]),
+    ("pdf-split.py 参数错误", [SPLIT_SCRIPT, "--pages", "x", "input.pdf"]),
+]
+
+# 启动时是否导入了这些耗时的依赖
+HEAVY_MODULES = ("pikepdf", "tkinter")
+
+def random_bytes(rng, size):
+    return bytes(rng.getrandbits(8) for _ in range(size))
+
+def make_text_page(pdf, font, index, lines=40):
+    content = ["BT /F1 10 Tf 50 760 Td 12 TL"]
+    for line in range(lines):
+        content.append(f"(Page {index} line {line}: the quick brown fox jumps over the lazy dog) '")
+    content.append("ET")
+    page = pikepdf.Dictionary(
+        Type=pikepdf.Name.Page,
+        MediaBox=[0, 0, 612, 792],
+        Resources=pikepdf.Dictionary(Font=pikepdf.Dictionary(F1=font)),
+        Contents=pdf.make_stream("\n".join(content).encode()),
+    )
+    return pikepdf.Page(page)
+
+def make_image(pdf, rng, size):
+    # 随机数据不可压缩，直接以原始 RGB 存储，大小可控
+    side = max(1, int((size / 3) ** 0.5))
+    return pdf.make_stream(
+        random_bytes(rng, side * side * 3),
+        Type=pikepdf.Name.XObject, Subtype=pikepdf.Name.Image,
+        Width=side, Height=side, ColorSpace=pikepdf.Name.DeviceRGB, BitsPerComponent=8,
+    )
+
+def standard_font(pdf):
+    return pdf.make_indirect(pikepdf.Dictionary(
+        Type=pikepdf.Name.Font, Subtype=pikepdf.Name.Type1, BaseFont=pikepdf.Name.Helvetica))
+
+def generate_text_only(path, pages, rng):
+    """
+    纯文本：每页一个内容流，所有页面共用一个标准字体
+    """
+    pdf = pikepdf.Pdf.new()
+    font = standard_font(pdf)
+    for i in range(pages):
+        pdf.pages.append(make_text_page(pdf, font, i))
+    pdf.save(path, deterministic_id=True)
+
+def generate_image_heavy(path, pages, rng, image_kb=200):
+    """
+    图片密集：每页一张独立的不可压缩图片
+    """
+    pdf = pikepdf.Pdf.new()
+    font = standard_font(pdf)
+    for i in range(pages):
+        page = make_text_page(pdf, font, i, lines=2)
+        image = make_image(pdf, rng, rng.randint(image_kb // 2, image_kb) * 1024)
+        page.Resources.XObject = pikepdf.Dictionary(Im0=image)
+        page.contents_add(pdf.make_stream(b"q 400 0 0 400 100 200 cm /Im0 Do Q"))
+        pdf.pages.append(page)
+    pdf.save(path, deterministic_id=True)
+
+def generate_shared_font(path, pages, rng, font_kb=500):
+    """
+    共享字体：一个嵌入字体和一个文档级 /Resources 字典被所有页面引用
+    """
+    pdf = pikepdf.Pdf.new()
+    font_file = pdf.make_stream(random_bytes(rng, font_kb * 1024))
+    descriptor = pdf.make_indirect(pikepdf.Dictionary(
+        Type=pikepdf.Name.FontDescriptor, FontName=pikepdf.Name.BenchFont, Flags=32,
+        FontBBox=[0, 0, 1000, 1000], ItalicAngle=0, Ascent=800, Descent=-200,
+        CapHeight=700, StemV=80, FontFile2=font_file))
+    font = pdf.make_indirect(pikepdf.Dictionary(
+        Type=pikepdf.Name.Font, Subtype=pikepdf.Name.TrueType, BaseFont=pikepdf.Name.BenchFont,
+        FirstChar=32, LastChar=126, Widths=[500] * 95, FontDescriptor=descriptor))
+    resources = pdf.make_indirect(pikepdf.Dictionary(Font=pikepdf.Dictionary(F1=font)))
+    for i in range(pages):
+        page = make_text_page(pdf, font, i)
+        page.Resources = resources
+        pdf.pages.append(page)
+    pdf.save(path, deterministic_id=True)
+
+def generate_many_small(directory, files, rng, pages_per_file=2):
+    """
+    大量小文件：用于合并测试，每个文件只有几页
+    """
+    os.makedirs(directory, exist_ok=True)
+    paths = []
+    for i in range(files):
+        pdf = pikepdf.Pdf.new()
+        font = standard_font(pdf)
+        for j in range(pages_per_file):
+            page = make_text_page(pdf, font, j, lines=10)
+            page.Resources.XObject = pikepdf.Dictionary(Logo=make_image(pdf, rng, 8 * 1024))
+            page.contents_add(pdf.make_stream(b"q 50 0 0 50 500 700 cm /Logo Do Q"))
+            pdf.pages.append(page)
+        path = os.path.join(directory, f"small_{i:05d}.pdf")
+        pdf.save(path, deterministic_id=True)
+        paths.append(path)
+    return paths
+
+def generate_corpus(corpus_dir, pages, files, seed):
+    """
+    生成可复现的测试语料，相同参数和种子总是得到相同的文件
+    """
+    os.makedirs(corpus_dir, exist_ok=True)
+    corpus = {}
+    for name, generator in (("text_only", generate_text_only),
+                            ("image_heavy", generate_image_heavy),
+                            ("shared_font", generate_shared_font)):
+        path = os.path.join(corpus_dir, f"{name}_{pages}.pdf")
+        if not os.path.exists(path):
+            generator(path, pages, random.Random(f"{seed}-{name}"))
+        corpus[name] = path
+    small_dir = os.path.join(corpus_dir, f"many_small_{files}")
+    if os.path.isdir(small_dir):
+        corpus["many_small"] = sorted(os.path.join(small_dir, f) for f in os.listdir(small_dir))
+    else:
+        corpus["many_small"] = generate_many_small(small_dir, files, random.Random(f"{seed}-many_small"))
+    return corpus
+
+def peak_rss_mb():
+    # ru_maxrss 在 exec 后保留父进程的峰值，spawn 启动的用例进程会继承生成语料时的内存；
+    # Linux 上改用只属于当前进程映像的 VmHWM
+    with contextlib.suppress(OSError):
+        with open("/proc/self/status", encoding="ascii") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) / 1024
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # macOS 上单位为字节，Linux 上为 KB
+    if sys.platform == "darwin":
+        return peak / (1024 * 1024)
+    return peak / 1024
+
+def directory_bytes(directory):
+    total = 0
+    for root, _, names in os.walk(directory):
+        for name in names:
+            total += os.path.getsize(os.path.join(root, name))
+    return total
+
+def run_case(entry_point, inputs, params):
+    """
+    在独立的子进程中运行一个测试用例，峰值内存只反映该用例本身
+    """
+    from pdfsplit import engine as split
+
+    save_count = 0
+    original_save = pikepdf.Pdf.save
+
+    def counting_save(self, *args, **kwargs):
+        nonlocal save_count
+        save_count += 1
+        return original_save(self, *args, **kwargs)
+
+    pikepdf.Pdf.save = counting_save
+    with tempfile.TemporaryDirectory(prefix="bench-") as output_dir:
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(StringIO()):
+            input_mode = params.get("input_mode", "default")
+            if entry_point == "split_pdf_by_pages":
+                split.split_pdf_by_pages(inputs, output_dir, params["pages_per_split"], input_mode=input_mode)
+            elif entry_point == "split_pdf_by_size":
+                split.split_pdf_by_size(inputs, output_dir, params["max_size_mb"], use_cache=False,
+                                        input_mode=input_mode)
+            elif entry_point == "merge_pdfs":
+                split.merge_pdfs(inputs, output_dir, "merged.pdf", input_mode=input_mode)
+            elif entry_point == "merge_pdfs_streaming":
+                split.merge_pdfs_streaming(inputs, output_dir, "merged.pdf",
+                                           memory_budget_mb=params["memory_budget_mb"], input_mode=input_mode)
+        wall_time = time.perf_counter() - start
+        bytes_written = directory_bytes(output_dir)
+
+    return {
+        "wall_time_s": round(wall_time, 4),
+        "saves": save_count,
+        "bytes_written": bytes_written,
+        "peak_rss_mb": peak_rss_mb(),
+    }
+
+def build_cases(corpus, input_modes):
+    """
+    每个入口在每种输入访问方式下各运行一次，便于比较普通读取与内存映射的耗时和内存
+    """
+    cases = []
+    for input_mode in input_modes:
+        for name in ("text_only", "image_heavy", "shared_font"):
+            path = corpus[name]
+            size_mb = os.path.getsize(path) / (1024 * 1024)
+            cases.append((name, "split_pdf_by_pages", path, {"pages_per_split": 10, "input_mode": input_mode}))
+            cases.append((name, "split_pdf_by_size", path,
+                          {"max_size_mb": round(max(size_mb / 8, 0.05), 3), "input_mode": input_mode}))
+        # 合并用例按输入数递增运行，比较峰值内存是否随输入总量增长
+        total = len(corpus["many_small"])
+        for count in sorted({max(total // 4, 1), max(total // 2, 1), total}):
+            name = "many_small" if count == total else f"many_small_{count}"
+            inputs = corpus["many_small"][:count]
+            cases.append((name, "merge_pdfs", inputs, {"input_mode": input_mode}))
+            cases.append((name, "merge_pdfs_streaming", inputs, {"memory_budget_mb": 16, "input_mode": input_mode}))
+    return cases
+
+def summarize_merge_scaling(results):
+    """
+    按入口和输入访问方式汇总合并用例的输入数与峰值内存：
+    流式合并的峰值内存应基本不随输入数增长，普通合并则随之线性增长
+    """
+    series = {}
+    for result in results:
+        if result["entry_point"] in ("merge_pdfs", "merge_pdfs_streaming"):
+            key = f"{result['entry_point']} [{result['params']['input_mode']}]"
+            series.setdefault(key, {})[result["inputs"]] = result["peak_rss_mb"]
+    summary = {}
+    for key, points in series.items():
+        summary[key] = [{"inputs": count, "peak_rss_mb": points[count]} for count in sorted(points)]
+        print(f"合并峰值内存 {key}: " + ", ".join(f"{count} 个输入 {points[count]:.1f} MB" for count in sorted(points)),
+              file=sys.stderr)
+    return summary
+
+def measure_startup(runs):
+    """
+    在全新的解释器中测量导入和命令行启动的耗时，每个用例取 runs 次的中位数，
+    并用 -X importtime 再运行一次，记录启动时导入了哪些耗时的依赖
+    """
+    results = []
+    for name, argv in STARTUP_CASES:
+        times = []
+        for _ in range(runs):
+            start = time.perf_counter()
+            subprocess.run([sys.executable, *argv], cwd=ROOT_DIR, capture_output=True)
+            times.append(time.perf_counter() - start)
+        trace = subprocess.run([sys.executable, "-X", "importtime", *argv], cwd=ROOT_DIR,
+                               capture_output=True, text=True).stderr
+        imported = [module for module in HEAVY_MODULES if re.search(rf"\| +{module}$", trace, re.M)]
+        results.append({"case": name, "median_ms": round(statistics.median(times) * 1000, 1),
+                        "min_ms": round(min(times) * 1000, 1), "heavy_imports": imported})
+        print(f"启动 [{name}]: {results[-1]['median_ms']:.1f} ms, 导入 {', '.join(imported) or '无'}", file=sys.stderr)
+    return results
+
+def run_corpus_cases(args, only=None):
+    """
+    生成（或复用）语料，在独立进程中逐个运行分割与合并用例
+    """
+    results = []
+    with contextlib.ExitStack() as stack:
+        corpus_dir = args.corpus_dir or stack.enter_context(tempfile.TemporaryDirectory(prefix="bench-corpus-"))
+        print(f"生成语料: {corpus_dir}", file=sys.stderr)
+        corpus = generate_corpus(corpus_dir, args.pages, args.files, args.seed)
+
+        # spawn 保证每个用例从干净的进程开始，峰值内存互不影响
+        context = multiprocessing.get_context("spawn")
+        for corpus_name, entry_point, inputs, params in build_cases(corpus, args.input_modes.split(",")):
+            if only and entry_point not in only:
+                continue
+            for run in range(args.repeat):
+                with context.Pool(1) as pool:
+                    metrics = pool.apply(run_case, (entry_point, inputs, params))
+                print(f"{entry_point} [{corpus_name}, {params['input_mode']}] #{run + 1}: {metrics['wall_time_s']:.3f}s, "
+                      f"{metrics['saves']} 次保存, 峰值内存 {metrics['peak_rss_mb']} MB", file=sys.stderr)
+                results.append({"corpus": corpus_name, "entry_point": entry_point, "run": run + 1,
+                                "inputs": len(inputs) if isinstance(inputs, list) else 1, "params": params,
+                                **metrics})
+    return results
+
+def git_revision():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT_DIR,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def main():
+    parser = argparse.ArgumentParser(description="PDF分割与合并性能基准测试")
+    parser.add_argument("--pages", type=int, default=200, help="单文件语料的页数，默认为200")
+    parser.add_argument("--files", type=int, default=200, help="合并测试的小文件数量，默认为200")
+    parser.add_argument("--seed", type=int, default=0, help="语料生成的随机种子，默认为0")
+    parser.add_argument("--corpus-dir", default=None, help="语料目录，已存在的语料会被复用，默认使用临时目录")
+    parser.add_argument("--repeat", type=int, default=1, help="每个用例重复运行的次数，默认为1")
+    parser.add_argument("--only", default=None,
+                        help="只运行指定入口，逗号分隔，例如 split_pdf_by_size,merge_pdfs；startup 为启动耗时用例")
+    parser.add_argument("--startup-runs", type=int, default=10, help="启动耗时用例每个运行的次数，默认为10")
+    parser.add_argument("--input-modes", default="default,mmap",
+                        help="比较的输入访问方式，逗号分隔，可选 default、stream、mmap，默认为 default,mmap")
+    parser.add_argument("-o", "--output", default=None, help="JSON结果输出文件，默认输出到标准输出")
+
+    args = parser.parse_args()
+
+    only = set(args.only.split(",")) if args.only else None
+    startup = measure_startup(max(args.startup_runs, 1)) if not only or "startup" in only else []
+
+    # 只运行启动耗时用例时不生成语料
+    results = run_corpus_cases(args, only) if only != {"startup"} else []
+
+    report = {
+        "revision": git_revision(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "python": platform.python_version(),
+        "pikepdf": pikepdf.__version__,
+        "pages": args.pages,
+        "files": args.files,
+        "seed": args.seed,
+        "startup": startup,
+        "merge_scaling": summarize_merge_scaling(results),
+        "results": results,
+    }
+    text = json.dumps(report, indent=2, ensure_ascii=False)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+
+if __name__ == "__main__":
+    main()
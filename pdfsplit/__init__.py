@@ -0,0 +1,16 @@
+import importlib
+
+# PDF 分割与合并引擎。导入本包不会导入 pikepdf：split_pdf_by_pages、merge_pdfs 等名称在第一次访问时
+# 从 pdfsplit.engine 取得，engine 在第一次真正用到 pikepdf 时才导入它。命令行在 pdfsplit.cli 中，
+# 图形界面在 pdfsplit.gui 中（导入时不加载 tkinter），asyncio 接口在 pdfsplit.aio 中
+
+def __getattr__(name):
+    if name.startswith("__"):
+        raise AttributeError(name)
+    engine = importlib.import_module(".engine", __name__)
+    try:
+        value = getattr(engine, name)
+    except AttributeError:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}") from None
+    globals()[name] = value
+    return value
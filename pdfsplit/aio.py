@@ -0,0 +1,186 @@
+import os
+import asyncio
+import threading
+import functools
+import contextlib
+from concurrent.futures import ProcessPoolExecutor
+
+from . import engine as _split
+
+# 取消后引擎在下一个进度事件处抛出的异常
+JobCancelled = _split.JobCancelled
+
+class _Listener:
+    """
+    在执行器线程中接收引擎的进度事件，把完成的部分和进度事件转交给事件循环。
+    cancelled 被设置后引擎在下一个事件处停止
+    """
+    def __init__(self, loop, on_progress=None, parts_queue=None):
+        self.loop = loop
+        self.on_progress = on_progress
+        self.parts_queue = parts_queue
+        self.cancelled = threading.Event()
+
+    def __call__(self, record):
+        if self.parts_queue is not None and record["event"] in ("part_written", "part_resumed"):
+            self.loop.call_soon_threadsafe(self.parts_queue.put_nowait, (record["path"], record["size_bytes"]))
+        if self.on_progress is not None:
+            self.loop.call_soon_threadsafe(self.on_progress, record)
+
+def _run(function_name, args, options, listener=None):
+    """
+    在执行器中运行一个引擎函数。listener 不为空时作为进度事件的监听器
+    """
+    progress = _split.Progress(listener, cancel_event=listener.cancelled) if listener is not None else None
+    return getattr(_split, function_name)(*args, progress=progress, **options)
+
+def _split_call(input_pdf_path, output_dir, options):
+    """
+    按分割方式选择引擎函数，返回 (函数名, 位置参数, 其余选项)
+    """
+    options = dict(options)
+    ranges = options.pop("ranges", None)
+    bookmarks = options.pop("bookmarks", False)
+    parts = options.pop("parts", None)
+    max_size_mb = options.pop("max_size_mb", None)
+    pages_per_split = options.pop("pages_per_split", None)
+    if ranges or bookmarks:
+        return "split_pdf_by_ranges", (input_pdf_path, output_dir, ranges), dict(options, by_outline=bookmarks)
+    if parts:
+        return "split_pdf_into_parts", (input_pdf_path, output_dir, parts), options
+    if max_size_mb:
+        return "split_pdf_by_size", (input_pdf_path, output_dir, max_size_mb), options
+    if pages_per_split:
+        return "split_pdf_by_pages", (input_pdf_path, output_dir, pages_per_split), options
+    raise ValueError("请提供分割方式：pages_per_split、max_size_mb、parts、ranges 或 bookmarks")
+
+def _merge_result(output_path):
+    if output_path is None:
+        raise ValueError("没有合并：没有输入或存在无效的输入")
+    return output_path
+
+class AsyncSplitEngine:
+    """
+    分割与合并的 asyncio 接口：pikepdf 的工作在 executor 中执行，不阻塞事件循环。
+    executor 为 None 时使用事件循环默认的线程池；也可以是 ProcessPoolExecutor，
+    但此时进度回调、逐个产出部分和运行中的取消都不可用（作业只能在开始前取消）。
+    max_concurrency 限制通过这个引擎同时执行的作业数。
+    在线程中运行的作业被取消时，在下一个进度事件处停止，已写完的部分和检查点日志保留，可以用 resume 继续
+    """
+    def __init__(self, executor=None, max_concurrency=None):
+        self.executor = executor
+        self.semaphore = asyncio.Semaphore(max_concurrency) if max_concurrency else None
+
+    async def _submit(self, function_name, args, options, on_progress=None, parts_queue=None):
+        loop = asyncio.get_running_loop()
+        listener = None
+        if not isinstance(self.executor, ProcessPoolExecutor):
+            listener = _Listener(loop, on_progress, parts_queue)
+        async with self.semaphore or contextlib.nullcontext():
+            future = loop.run_in_executor(self.executor, functools.partial(_run, function_name, args, options,
+                                                                           listener))
+            try:
+                return await asyncio.shield(future)
+            except asyncio.CancelledError:
+                if listener is not None:
+                    listener.cancelled.set()
+                    # 等待引擎停止，取消返回后不会再有文件写出
+                    with contextlib.suppress(Exception):
+                        await future
+                else:
+                    future.cancel()
+                raise
+
+    async def split(self, input_pdf_path, output_dir, on_progress=None, **options):
+        """
+        分割一个PDF，返回 (输出路径, 字节数) 列表。
+        分割方式为 pages_per_split、max_size_mb、parts、ranges 或 bookmarks 之一，
+        其余选项（balance、jobs、use_cache、input_mode、save_profile、prune、resume 等）原样传给引擎。
+        on_progress 在事件循环中接收每个进度事件
+        """
+        os.makedirs(output_dir, exist_ok=True)
+        return await self._submit(*_split_call(input_pdf_path, output_dir, options), on_progress=on_progress)
+
+    async def merge(self, input_pdf_paths, output_dir, output_file_name=None, stream=False, on_progress=None,
+                    **options):
+        """
+        合并多个PDF，返回输出文件路径。stream 为 True 时使用流式合并，
+        其余选项（dedup、memory_budget_mb、max_open_files、prefetch、save_profile 等）原样传给引擎。
+        没有输入或存在无效的输入时抛出 ValueError
+        """
+        os.makedirs(output_dir, exist_ok=True)
+        function_name = "merge_pdfs_streaming" if stream else "merge_pdfs"
+        output_path = await self._submit(function_name, (list(input_pdf_paths), output_dir, output_file_name),
+                                         options, on_progress=on_progress)
+        return _merge_result(output_path)
+
+    async def iter_parts(self, input_pdf_path, output_dir, **options):
+        """
+        分割一个PDF，每个部分写完后立即产出 (输出路径, 字节数)，调用方可以边分割边处理。
+        提前结束迭代时取消分割
+        """
+        os.makedirs(output_dir, exist_ok=True)
+        parts_queue = asyncio.Queue()
+        task = asyncio.ensure_future(self._submit(*_split_call(input_pdf_path, output_dir, options),
+                                                  parts_queue=parts_queue))
+        try:
+            while True:
+                getter = asyncio.ensure_future(parts_queue.get())
+                await asyncio.wait({getter, task}, return_when=asyncio.FIRST_COMPLETED)
+                if getter.done():
+                    yield getter.result()
+                    continue
+                getter.cancel()
+                # 作业已结束：先产出队列中剩余的部分，再抛出作业的异常
+                while not parts_queue.empty():
+                    yield parts_queue.get_nowait()
+                parts = task.result()
+                if isinstance(self.executor, ProcessPoolExecutor):
+                    # 进程池中没有逐个部分的事件，结束后一次产出
+                    for part in parts:
+                        yield part
+                return
+        finally:
+            if not task.done():
+                task.cancel()
+                with contextlib.suppress(asyncio.CancelledError):
+                    await task
+
+    async def split_many(self, input_pdf_paths, output_dir, concurrency=4, **options):
+        """
+        分割多个PDF，最多同时执行 concurrency 个，按输入顺序返回各自的 (输出路径, 字节数) 列表。
+        任何一个失败时取消其余的作业
+        """
+        semaphore = asyncio.Semaphore(max(concurrency, 1))
+
+        async def split_one(input_pdf_path):
+            async with semaphore:
+                return await self.split(input_pdf_path, output_dir, **options)
+
+        tasks = [asyncio.ensure_future(split_one(input_pdf_path)) for input_pdf_path in input_pdf_paths]
+        try:
+            return await asyncio.gather(*tasks)
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            raise
+
+async def split(input_pdf_path, output_dir, executor=None, on_progress=None, **options):
+    """
+    在 executor（默认为事件循环的线程池）中分割一个PDF，参数见 AsyncSplitEngine.split
+    """
+    return await AsyncSplitEngine(executor).split(input_pdf_path, output_dir, on_progress, **options)
+
+async def merge(input_pdf_paths, output_dir, output_file_name=None, executor=None, on_progress=None, **options):
+    """
+    在 executor（默认为事件循环的线程池）中合并多个PDF，参数见 AsyncSplitEngine.merge
+    """
+    return await AsyncSplitEngine(executor).merge(input_pdf_paths, output_dir, output_file_name,
+                                                  on_progress=on_progress, **options)
+
+def iter_parts(input_pdf_path, output_dir, executor=None, **options):
+    """
+    边分割边产出完成的部分，参数见 AsyncSplitEngine.iter_parts
+    """
+    return AsyncSplitEngine(executor).iter_parts(input_pdf_path, output_dir, **options)
@@ -0,0 +1,259 @@
+import os
+import sys
+import json
+import argparse
+import contextlib
+
+from .engine import (INPUT_MODES, SAVE_PROFILES, ArchiveWriter, JsonLinesProgress, NullProfiler, Profiler, Progress,
+                     ProgressLine, append_pdfs, collect_batch_inputs, compare_save_profiles, is_path, merge_pdfs,
+                     merge_pdfs_streaming, read_archive_inputs, read_stdin_pdf, source_name, source_size, split_batch,
+                     split_pdf_by_pages, split_pdf_by_ranges, split_pdf_by_size, split_pdf_into_parts, write_atomic)
+
+def build_parser():
+    """
+    创建命令行参数解析器。只读取选项的工具可以直接调用，不会导入 pikepdf
+    """
+    parser = argparse.ArgumentParser(description="PDF分割与合并工具")
+    parser.add_argument("input_pdfs", nargs='+', help="输入的PDF文件路径。单个文件用于分割，多个文件用于合并。"
+                        "分割时为 - 表示从标准输入读取PDF，合并时为 - 表示从标准输入读取包含多个PDF的归档")
+    parser.add_argument("-m", "--merge", action="store_true", help="合并多个PDF文件")
+    parser.add_argument("-b", "--batch", action="store_true", help="批量分割：输入为目录或通配符，按同一方式分割其中所有PDF文件")
+    parser.add_argument("--manifest", help="批量分割的清单文件路径，默认为输出目录（未指定时为当前目录）下的 split_manifest.json", default=None)
+    parser.add_argument("-s", "--size", type=float, help="按大小分割的最大文件大小 (MB)，支持小数")
+    parser.add_argument("-p", "--pages", type=int, help="按页数分割的每个文件的页数")
+    parser.add_argument("-r", "--ranges", help="按页面范围分割，例如 1-10,11-40,41- ，每个范围生成一个文件")
+    parser.add_argument("--bookmarks", action="store_true", help="按顶层书签分割，每个书签生成一个文件")
+    parser.add_argument("-k", "--parts", type=int, help="分割为指定数量的部分，各部分大小尽量均衡")
+    parser.add_argument("--balance", choices=["size", "pages"], default="size",
+                        help="按数量分割时的均衡方式：size（按估算字节数，使最大部分尽可能小，默认）或 pages（按页数）")
+    parser.add_argument("--no-cache", action="store_true", help="按大小分割时不读写页面范围大小缓存")
+    parser.add_argument("--cache-dir", default=None, help="页面范围大小缓存目录，默认为 ~/.cache/pdf-split")
+    parser.add_argument("--cache-max-mb", type=float, default=64, help="缓存目录的大小上限 (MB)，超出时淘汰最久未使用的记录，默认为64")
+    parser.add_argument("-j", "--jobs", type=int, default=1, help="按页数分割时并行写出的进程数，批量分割时为同时处理的文件数，默认为1")
+    parser.add_argument("--input-mode", choices=sorted(INPUT_MODES), default="default",
+                        help="输入文件的访问方式：default、stream（普通读取）或 mmap（内存映射，适用于超大文件）")
+    parser.add_argument("--save-profile", choices=list(SAVE_PROFILES), default="default",
+                        help="输出文件的保存配置：default、fast（保存最快）、compact（文件最小）或 web（线性化，便于网页浏览）")
+    parser.add_argument("--prune", action="store_true", help="分割时删除每个部分中页面内容未引用的字体、图片等资源，并报告节省的字节数")
+    parser.add_argument("--resume", action="store_true",
+                        help="继续上次中断的分割或流式合并：校验输出目录中已完成的部分，从第一个缺失的部分继续")
+    parser.add_argument("--compare-profiles", action="store_true", help="以每种保存配置保存输入文件，比较耗时与文件大小")
+    parser.add_argument("-o", "--output", help="输出目录，默认与输入PDF相同。为 - 时分割结果以归档流、合并结果以PDF输出到标准输出", default=None)
+    parser.add_argument("--archive", choices=["tar", "zip"], default="tar",
+                        help="分割输出到标准输出以及合并从标准输入读取时使用的归档格式，默认为 tar")
+    parser.add_argument("-f", "--filename", help="合并后的输出文件名，仅在合并时使用", default=None)
+    parser.add_argument("--dedup", action="store_true", help="合并时按内容哈希合并各输入间字节相同的字体、图片和表单")
+    parser.add_argument("--stream", action="store_true", help="以有限内存分批合并，适用于大量输入文件")
+    parser.add_argument("--memory-budget", type=float, default=256, help="流式合并时每批输入的内存预算 (MB)，默认为256")
+    parser.add_argument("--max-open", type=int, default=64, help="流式合并时同时打开的文件数上限，默认为64")
+    parser.add_argument("--prefetch", type=int, default=4, help="合并时在后台提前打开的输入文件数，0 表示不预取，默认为4")
+    parser.add_argument("--append", metavar="BUNDLE", default=None,
+                        help="将输入追加到已有的合并文件末尾：以增量更新方式只写出新对象和新的交叉引用节，不重写原有内容；文件不存在时新建")
+    parser.add_argument("--rewrite-every", type=int, default=0,
+                        help="追加时合并文件已有指定次数的增量更新则改为完整重写，丢弃被替换的旧对象，默认为0（从不重写）")
+    parser.add_argument("--progress", choices=["line", "json"], default=None,
+                        help="输出结构化进度：line（在一行中实时显示百分比、页/秒、MB/秒和剩余时间）或 json（每个事件一行 JSON）")
+    parser.add_argument("--progress-output", default=None, help="进度的输出文件，默认输出到标准错误")
+    parser.add_argument("--profile", nargs="?", const="table", choices=["table", "json"], default=None,
+                        help="输出各阶段耗时、调用次数和字节数统计，格式为 table（默认）或 json")
+    parser.add_argument("--profile-output", default=None, help="性能统计的输出文件，默认输出到标准错误")
+    parser.add_argument("--cprofile", default=None, help="将 cProfile 统计数据保存到指定文件，可用 pstats 或 snakeviz 查看")
+    return parser
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+
+    # 输出到标准输出时标准输出只包含归档或PDF数据，进度信息改为输出到标准错误
+    args.output_stream = sys.stdout.buffer if args.output == "-" else None
+    profiler = Profiler() if args.profile else None
+    cprofiler = None
+    if args.cprofile:
+        import cProfile
+        cprofiler = cProfile.Profile()
+    progress_file = open(args.progress_output, "w", encoding="utf-8") if args.progress and args.progress_output else None
+    progress = None
+    if args.progress:
+        renderer = ProgressLine if args.progress == "line" else JsonLinesProgress
+        progress = Progress(renderer(progress_file or sys.stderr))
+    if cprofiler:
+        cprofiler.enable()
+    with contextlib.redirect_stdout(sys.stderr if args.output_stream is not None else sys.stdout):
+        try:
+            run_command(args, profiler, progress)
+        finally:
+            if cprofiler:
+                cprofiler.disable()
+                cprofiler.dump_stats(args.cprofile)
+                print(f"cProfile 数据: {args.cprofile}")
+            if profiler:
+                write_profile_report(profiler, args.profile, args.profile_output)
+            if progress_file:
+                progress_file.close()
+
+def write_profile_report(profiler, fmt, output_path=None):
+    """
+    以表格或 JSON 格式输出性能统计，未指定文件时输出到标准错误，不影响正常输出
+    """
+    if fmt == "json":
+        text = json.dumps(profiler.report(), indent=2, ensure_ascii=False)
+    else:
+        text = profiler.format_table()
+    if output_path:
+        with open(output_path, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    else:
+        print(text, file=sys.stderr)
+
+def print_profile_comparison(input_pdf_path, input_mode="default"):
+    """
+    输出各保存配置的耗时、文件大小及其相对原文件的比例
+    """
+    original_size = source_size(input_pdf_path)
+    print(f"原文件: {source_name(input_pdf_path)} (大小: {original_size / (1024 * 1024):.2f} MB)")
+    print(f"{'配置':<10}{'耗时(秒)':>12}{'大小(MB)':>12}{'相对原文件':>12}")
+    for result in compare_save_profiles(input_pdf_path, input_mode):
+        ratio = result["size_bytes"] / original_size if original_size else 0
+        print(f"{result['profile']:<10}{result['seconds']:>12.3f}{result['size_bytes'] / (1024 * 1024):>12.2f}"
+              f"{ratio:>12.1%}")
+
+def run_command(args, profiler=None, progress=None):
+    """
+    根据命令行参数执行分割或合并，progress 接收结构化进度事件
+    """
+    if args.merge or args.append:
+        # 合并操作
+        from_stdin = args.input_pdfs == ["-"]
+        if args.stream and (from_stdin or args.output_stream is not None):
+            print("流式合并需要在磁盘上写批次文件，不支持从标准输入读取或输出到标准输出。")
+            return
+
+        # 输入为 - 时从标准输入读取包含多个PDF的归档
+        input_pdfs = read_archive_inputs(sys.stdin.buffer, args.archive) if from_stdin else args.input_pdfs
+        if args.append:
+            # 追加模式直接修改合并文件，一个输入即可
+            if args.stream or args.output_stream is not None:
+                print("追加模式直接修改已有的合并文件，不支持流式合并或输出到标准输出。")
+                return
+            append_pdfs(args.append, input_pdfs, rewrite_every=args.rewrite_every, dedup=args.dedup,
+                        profiler=profiler, input_mode=args.input_mode, save_profile=args.save_profile,
+                        prefetch=args.prefetch, progress=progress)
+            return
+        if len(input_pdfs) < 2:
+            print("合并操作需要至少两个PDF文件。")
+            return
+
+        if args.output_stream is not None:
+            merge_pdfs(input_pdfs, None, dedup=args.dedup, profiler=profiler, save_profile=args.save_profile,
+                       output_stream=args.output_stream, prefetch=args.prefetch, progress=progress)
+            return
+        
+        # 如果没有指定输出目录，默认输出到第一个输入PDF文件的目录
+        if args.output is None:
+            args.output = "." if from_stdin else os.path.dirname(args.input_pdfs[0])
+        
+        if not os.path.exists(args.output):
+            os.makedirs(args.output)
+        
+        if args.stream:
+            merge_pdfs_streaming(args.input_pdfs, args.output, args.filename,
+                                 memory_budget_mb=args.memory_budget, max_open_files=args.max_open,
+                                 dedup=args.dedup, profiler=profiler, input_mode=args.input_mode,
+                                 save_profile=args.save_profile, resume=args.resume, prefetch=args.prefetch,
+                                 progress=progress)
+        else:
+            merge_pdfs(input_pdfs, args.output, args.filename, dedup=args.dedup, profiler=profiler,
+                       input_mode=args.input_mode, save_profile=args.save_profile, prefetch=args.prefetch,
+                       progress=progress)
+    elif args.batch:
+        # 批量分割操作
+        if args.output_stream is not None:
+            print("批量分割将各部分和清单写入目录，不支持输出到标准输出。")
+            return
+        if not args.size and not args.pages:
+            print("请提供分割方式：按页数(-p)或按大小(-s)。")
+            return
+
+        input_pdfs = collect_batch_inputs(args.input_pdfs)
+        if not input_pdfs:
+            print("没有找到要分割的PDF文件。")
+            return
+
+        # 未指定输出目录时，各文件的分割结果输出到其所在目录
+        if args.output is not None and not os.path.exists(args.output):
+            os.makedirs(args.output)
+
+        manifest_path = args.manifest or os.path.join(args.output or os.getcwd(), "split_manifest.json")
+        size_options = {"use_cache": not args.no_cache, "cache_dir": args.cache_dir, "max_cache_mb": args.cache_max_mb}
+        with (profiler or NullProfiler()).phase("batch"):
+            try:
+                split_batch(input_pdfs, args.output, max_size_mb=args.size, pages_per_split=args.pages,
+                            jobs=args.jobs, manifest_path=manifest_path, size_options=size_options,
+                            input_mode=args.input_mode, save_profile=args.save_profile, prune=args.prune,
+                            resume=args.resume, progress=progress)
+            except ValueError as e:
+                print(e)
+    else:
+        # 分割操作
+        if len(args.input_pdfs) != 1:
+            print("分割操作需要一个输入PDF文件。")
+            return
+        
+        input_pdf = args.input_pdfs[0]
+
+        if args.compare_profiles and args.output_stream is not None:
+            print("比较保存配置只输出统计表，不支持输出到标准输出。")
+            return
+        
+        if input_pdf == "-":
+            input_pdf = read_stdin_pdf()
+        elif not os.path.exists(input_pdf):
+            print("输入的PDF文件不存在!")
+            return
+        
+        if args.compare_profiles:
+            print_profile_comparison(input_pdf, args.input_mode)
+            return
+
+        # 输出为 - 时各部分写成归档流输出到标准输出，不写文件
+        archive = None
+        write_part = write_atomic
+        if args.output_stream is not None:
+            archive = ArchiveWriter(args.output_stream, args.archive)
+            args.output, write_part = "", archive.add
+        else:
+            # 如果没有指定输出目录，默认输出到输入PDF文件的目录
+            if args.output is None:
+                args.output = os.path.dirname(input_pdf) if is_path(input_pdf) else "."
+            
+            if not os.path.exists(args.output):
+                os.makedirs(args.output)
+
+        if args.ranges or args.bookmarks:
+            try:
+                split_pdf_by_ranges(input_pdf, args.output, args.ranges, by_outline=args.bookmarks, profiler=profiler,
+                                    input_mode=args.input_mode, save_profile=args.save_profile, write_part=write_part,
+                                    prune=args.prune, resume=args.resume, progress=progress)
+            except ValueError as e:
+                print(e)
+        elif args.parts is not None:
+            try:
+                split_pdf_into_parts(input_pdf, args.output, args.parts, balance=args.balance, profiler=profiler,
+                                     input_mode=args.input_mode, save_profile=args.save_profile, write_part=write_part,
+                                     prune=args.prune, resume=args.resume, progress=progress)
+            except ValueError as e:
+                print(e)
+        elif args.size:
+            split_pdf_by_size(input_pdf, args.output, args.size, use_cache=not args.no_cache,
+                              cache_dir=args.cache_dir, max_cache_mb=args.cache_max_mb, profiler=profiler,
+                              input_mode=args.input_mode, save_profile=args.save_profile, write_part=write_part,
+                              prune=args.prune, resume=args.resume, progress=progress)
+        elif args.pages:
+            split_pdf_by_pages(input_pdf, args.output, args.pages, jobs=args.jobs, profiler=profiler,
+                               input_mode=args.input_mode, save_profile=args.save_profile, write_part=write_part,
+                               prune=args.prune, resume=args.resume, progress=progress)
+        else:
+            print("请提供分割方式：按页数(-p)、按大小(-s)、按部分数(-k)、按页面范围(-r)或按书签(--bookmarks)。")
+
+        # 只有正常结束时才写出归档结尾，出错时下游能发现归档不完整
+        if archive is not None:
+            archive.close()
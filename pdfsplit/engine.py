@@ -0,0 +1,2499 @@
+import os
+import sys
+import re
+import glob
+import json
+import stat
+import time
+import queue
+import bisect
+import shutil
+import hashlib
+import functools
+import threading
+import contextlib
+import tempfile
+from io import BytesIO
+from array import array
+from decimal import Decimal
+from collections import deque
+import concurrent.futures
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from .lazy import LazyModule
+
+try:
+    import resource
+except ImportError:  # Windows 上没有 resource 模块
+    resource = None
+
+# 第一次用到时才导入：导入 pikepdf 约需 0.1 秒，tarfile、zipfile 只在读写归档流时使用。
+# 进程池通过 concurrent.futures.ProcessPoolExecutor 访问，concurrent.futures 在第一次访问时才导入 multiprocessing
+pikepdf = LazyModule("pikepdf")
+tarfile = LazyModule("tarfile")
+multiprocessing = LazyModule("multiprocessing")
+zipfile = LazyModule("zipfile")
+
+# 每个间接对象的 "n 0 obj ... endobj" 与 xref 条目开销
+OBJECT_OVERHEAD = 40
+
+class Profiler:
+    """
+    分阶段计时器：累计各阶段（打开、复制页面、试探保存、最终保存、写盘等）的耗时与调用次数，
+    以及序列化字节数与实际写出字节数。写出线程也会记录，因此内部加锁
+    """
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.phases = {}
+        self.counters = {}
+        self.lock = threading.Lock()
+
+    @contextlib.contextmanager
+    def phase(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            with self.lock:
+                seconds, calls = self.phases.get(name, (0.0, 0))
+                self.phases[name] = (seconds + elapsed, calls + 1)
+
+    def count(self, name, amount=1):
+        with self.lock:
+            self.counters[name] = self.counters.get(name, 0) + amount
+
+    def report(self):
+        """
+        返回可序列化为 JSON 的报告
+        """
+        parts = self.counters.get("parts", 0)
+        probe_saves = self.phases.get("probe_save", (0.0, 0))[1]
+        return {
+            "total_s": round(time.perf_counter() - self.started, 4),
+            "phases": {name: {"seconds": round(seconds, 4), "calls": calls}
+                       for name, (seconds, calls) in self.phases.items()},
+            "counters": dict(self.counters),
+            "probe_saves_per_part": round(probe_saves / parts, 2) if parts else None,
+        }
+
+    def format_table(self):
+        """
+        返回便于阅读的表格文本
+        """
+        report = self.report()
+        lines = [f"{'阶段':<16}{'耗时(秒)':>12}{'次数':>10}"]
+        for name, stats in sorted(report["phases"].items(), key=lambda item: -item[1]["seconds"]):
+            lines.append(f"{name:<16}{stats['seconds']:>12.3f}{stats['calls']:>10}")
+        lines.append(f"{'total':<16}{report['total_s']:>12.3f}")
+        for name, value in sorted(report["counters"].items()):
+            if name.startswith("bytes_"):
+                lines.append(f"{name:<16}{value / (1024 * 1024):>12.2f} MB")
+            else:
+                lines.append(f"{name:<16}{value:>12}")
+        if report["probe_saves_per_part"] is not None:
+            lines.append(f"{'probe/part':<16}{report['probe_saves_per_part']:>12}")
+        return "\n".join(lines)
+
+class NullProfiler(Profiler):
+    """
+    未开启性能分析时使用的空实现
+    """
+    def __init__(self):
+        pass
+
+    @contextlib.contextmanager
+    def phase(self, name):
+        yield
+
+    def count(self, name, amount=1):
+        pass
+
+# 进度事件类型：作业开始、部分开始、试探保存、部分写出、跳过上次已完成的部分、
+# 合并完一个输入、批量分割完一个文件、作业结束
+PROGRESS_EVENTS = ("job_started", "part_started", "probe_save", "part_written", "part_resumed",
+                   "file_merged", "file_split", "job_finished")
+
+class JobCancelled(Exception):
+    """
+    作业已被取消：Progress 的 cancel_event 被设置后，在下一个进度事件处抛出，中止分割或合并
+    """
+
+class Progress:
+    """
+    结构化进度事件：分割与合并的各个步骤产生带类型的事件（字典），依次交给每个 listener 处理。
+    每个事件都附带累计完成的页数和字节数（分割为写出的字节数，合并为已合并的输入字节数）、
+    页/秒、MB/秒、完成百分比和预计剩余时间（总量未知时为 None）。写出线程也会产生事件，因此内部加锁。
+    cancel_event 被设置后，下一个事件交给 listener 后抛出 JobCancelled，已写完的部分和检查点日志保留
+    """
+    def __init__(self, *listeners, cancel_event=None):
+        self.listeners = list(listeners)
+        self.cancel_event = cancel_event
+        self.lock = threading.Lock()
+        self._reset()
+
+    def _reset(self, total_pages=None, total_bytes=None):
+        self.started = time.perf_counter()
+        self.total_pages = total_pages
+        self.total_bytes = total_bytes
+        self.pages_done = 0
+        self.bytes_done = 0
+
+    def emit(self, event, done_pages=0, done_bytes=0, **fields):
+        """
+        产生一个事件。done_pages、done_bytes 为该事件完成的工作量，计入累计值和吞吐量
+        """
+        with self.lock:
+            if event == "job_started":
+                self._reset(fields.get("total_pages"), fields.get("total_bytes"))
+            elif event == "part_resumed" and self.total_pages is not None:
+                # 上次已完成的部分不计入本次的吞吐量，只从剩余工作量中扣除
+                self.total_pages -= fields.get("pages", 0)
+            self.pages_done += done_pages
+            self.bytes_done += done_bytes
+
+            elapsed = time.perf_counter() - self.started
+            if self.total_pages:
+                fraction = self.pages_done / self.total_pages
+            elif self.total_bytes:
+                fraction = self.bytes_done / self.total_bytes
+            else:
+                fraction = None
+            record = {"event": event, **fields,
+                      "pages_done": self.pages_done,
+                      "bytes_done": self.bytes_done,
+                      "elapsed_s": round(elapsed, 3),
+                      "pages_per_s": round(self.pages_done / elapsed, 2) if elapsed else 0.0,
+                      "mb_per_s": round(self.bytes_done / (1024 * 1024) / elapsed, 3) if elapsed else 0.0,
+                      "percent": round(min(fraction, 1.0) * 100, 1) if fraction is not None else None,
+                      "eta_s": round(elapsed * (1 - fraction) / fraction, 1) if fraction else None}
+            for listener in self.listeners:
+                listener(record)
+        # 事件描述的工作已经完成，先交给 listener 再中止；作业结束后不再取消
+        if self.cancel_event is not None and self.cancel_event.is_set() and event != "job_finished":
+            raise JobCancelled()
+
+class NullProgress(Progress):
+    """
+    不需要进度事件时使用的空实现
+    """
+    def __init__(self):
+        pass
+
+    def emit(self, event, done_pages=0, done_bytes=0, **fields):
+        pass
+
+class ProgressLine:
+    """
+    在终端的一行中实时显示进度，每个事件覆盖上一次的内容，作业结束时换行。
+    光标留在行首，其他输出会直接覆盖进度行
+    """
+    def __init__(self, stream=None):
+        self.stream = stream or sys.stderr
+
+    def __call__(self, record):
+        fields = []
+        if record["percent"] is not None:
+            fields.append(f"{record['percent']:5.1f}%")
+        fields.append(f"{record['pages_done']} 页")
+        fields.append(f"{record['bytes_done'] / (1024 * 1024):.1f} MB")
+        fields.append(f"{record['pages_per_s']:.1f} 页/秒")
+        fields.append(f"{record['mb_per_s']:.2f} MB/秒")
+        if record["eta_s"] is not None:
+            fields.append(f"剩余 {record['eta_s']:.0f} 秒")
+        self.stream.write("\r\033[K" + " | ".join(fields) + ("\n" if record["event"] == "job_finished" else "\r"))
+        self.stream.flush()
+
+class JsonLinesProgress:
+    """
+    每个事件输出为一行 JSON，便于采集吞吐量指标
+    """
+    def __init__(self, stream=None):
+        self.stream = stream or sys.stderr
+
+    def __call__(self, record):
+        self.stream.write(json.dumps(record, ensure_ascii=False) + "\n")
+        self.stream.flush()
+
+def estimate_object_size(obj):
+    """
+    估算一个间接对象写出后的字节数：对象字典加上流的原始数据
+    """
+    if isinstance(obj, pikepdf.Stream):
+        return OBJECT_OVERHEAD + len(obj.stream_dict.unparse(resolved=True)) + int(obj.get('/Length', 0))
+    return OBJECT_OVERHEAD + len(obj.unparse(resolved=True))
+
+# 输入文件的访问方式，对应 pikepdf.AccessMode 中的同名成员
+INPUT_MODES = ("default", "stream", "mmap")
+
+def is_path(input_pdf):
+    """
+    输入是文件路径还是内存中的输入（标准输入或归档成员读入的 BytesIO）
+    """
+    return isinstance(input_pdf, (str, os.PathLike))
+
+def source_name(input_pdf):
+    """
+    输入的名称：文件路径本身，或内存中输入的 name 属性
+    """
+    return input_pdf if is_path(input_pdf) else getattr(input_pdf, "name", "stdin.pdf")
+
+def source_size(input_pdf):
+    return os.path.getsize(input_pdf) if is_path(input_pdf) else input_pdf.getbuffer().nbytes
+
+def read_stdin_pdf(name="stdin.pdf"):
+    """
+    将标准输入的PDF读入内存。PDF需要随机访问（xref 在文件末尾），无法边读边解析管道
+    """
+    buffer = BytesIO(sys.stdin.buffer.read())
+    buffer.name = name
+    return buffer
+
+def open_source_pdf(input_pdf_path, input_mode="default"):
+    """
+    打开输入PDF。input_mode 为 mmap 时以内存映射方式访问文件（映射失败时退回普通读取），
+    读取由操作系统按页换入，不经过额外的用户态缓冲；对象仍由 qpdf 在被访问时才解析，
+    页面只在某个部分需要时才载入。内存中的输入忽略 input_mode
+    """
+    if not is_path(input_pdf_path):
+        input_pdf_path.seek(0)
+        return pikepdf.Pdf.open(input_pdf_path)
+    if input_mode not in INPUT_MODES:
+        raise ValueError(f"未知的输入访问方式: {input_mode}")
+    return pikepdf.Pdf.open(input_pdf_path, access_mode=getattr(pikepdf.AccessMode, input_mode))
+
+# 输出文件的保存配置：options 为传给 Pdf.save 的参数（枚举参数写为成员名，保存时才换成 pikepdf 的枚举），
+# flate_level 为新压缩流使用的 zlib 级别（None 为默认）。
+# fast 不生成对象流、不解码重压缩已有的流，保存最快；compact 生成对象流并以最高级别重新压缩所有流，
+# 文件最小但保存最慢；web 线性化输出，浏览器可在下载完成前显示第一页
+SAVE_PROFILES = {
+    "default": {"options": {}, "flate_level": None},
+    "fast": {
+        "options": {"object_stream_mode": "disable",
+                    "stream_decode_level": "none",
+                    "recompress_flate": False},
+        "flate_level": 1,
+    },
+    "compact": {
+        "options": {"object_stream_mode": "generate",
+                    "stream_decode_level": "generalized",
+                    "recompress_flate": True},
+        "flate_level": 9,
+    },
+    "web": {
+        "options": {"object_stream_mode": "generate", "linearize": True},
+        "flate_level": None,
+    },
+}
+
+class _FlateLevelGate:
+    """
+    zlib 压缩级别是 pikepdf 的进程级全局设置。使用相同级别的保存可以同时进行，
+    级别不同的保存（包括使用默认级别的 default 和 web）等待正在进行的保存全部结束后才切换级别，
+    其他线程中的 compact 保存不会在保存中途改变 default 保存的压缩级别
+    """
+    def __init__(self):
+        self.condition = threading.Condition()
+        self.level = -1
+        self.active = 0
+
+    @contextlib.contextmanager
+    def use(self, level):
+        with self.condition:
+            while self.active and self.level != level:
+                self.condition.wait()
+            if self.level != level:
+                pikepdf.settings.set_flate_compression_level(level)
+                self.level = level
+            self.active += 1
+        try:
+            yield
+        finally:
+            with self.condition:
+                self.active -= 1
+                if not self.active:
+                    # 全部保存结束后恢复默认级别，不影响调用方自己的保存
+                    if self.level != -1:
+                        pikepdf.settings.set_flate_compression_level(-1)
+                        self.level = -1
+                    self.condition.notify_all()
+
+_flate_level_gate = _FlateLevelGate()
+
+def save_options(save_profile="default"):
+    """
+    返回保存配置对应的 Pdf.save 参数，成员名换成 pikepdf 的枚举
+    """
+    enums = {"object_stream_mode": pikepdf.ObjectStreamMode, "stream_decode_level": pikepdf.StreamDecodeLevel}
+    return {key: getattr(enums[key], value) if key in enums else value
+            for key, value in SAVE_PROFILES[save_profile]["options"].items()}
+
+def save_pdf(pdf, target, save_profile="default"):
+    """
+    按保存配置将PDF保存到文件路径或缓冲区
+    """
+    profile = SAVE_PROFILES[save_profile]
+    options = save_options(save_profile)
+    level = -1 if profile["flate_level"] is None else profile["flate_level"]
+    with _flate_level_gate.use(level):
+        pdf.save(target, **options)
+
+def compare_save_profiles(input_pdf_path, input_mode="default", profiles=None):
+    """
+    以每种保存配置将整个文档保存到内存，返回各配置的耗时与输出字节数，用于权衡速度与大小
+    """
+    results = []
+    with open_source_pdf(input_pdf_path, input_mode) as pdf:
+        for save_profile in profiles or SAVE_PROFILES:
+            buffer = BytesIO()
+            start = time.perf_counter()
+            save_pdf(pdf, buffer, save_profile)
+            results.append({"profile": save_profile, "seconds": round(time.perf_counter() - start, 4),
+                            "size_bytes": buffer.tell()})
+    return results
+
+def get_output_file_name(input_pdf_path, output_dir, suffix):
+    """
+    生成输出文件的完整路径，格式为 baseName_suffix.pdf
+    """
+    base_name = os.path.splitext(os.path.basename(source_name(input_pdf_path)))[0]
+    return os.path.join(output_dir, f"{base_name}_part_{suffix}.pdf")
+
+def _read_umask():
+    # umask 只能在设置时读出，导入时读取一次，避免之后与其他线程创建文件竞争
+    umask = os.umask(0o022)
+    os.umask(umask)
+    return umask
+
+_UMASK = _read_umask()
+
+def create_temp_output(output_path):
+    """
+    在目标文件所在目录创建用于原子替换的临时文件，返回 (文件描述符, 临时文件路径)。
+    mkstemp 创建的文件权限为 0600，替换后会沿用到输出文件上，其他用户（网页服务、上传进程等）无法读取，
+    因此改为目标文件已有的权限；目标不存在时与直接创建文件相同，按 umask 使用 0666
+    """
+    fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(output_path) or ".",
+                                     prefix=f".{os.path.basename(output_path)}.", suffix=".tmp")
+    try:
+        try:
+            mode = stat.S_IMODE(os.stat(output_path).st_mode)
+        except FileNotFoundError:
+            mode = 0o666 & ~_UMASK
+        os.chmod(temp_path, mode)
+    except BaseException:
+        os.close(fd)
+        os.remove(temp_path)
+        raise
+    return fd, temp_path
+
+def write_atomic(output_path, data):
+    """
+    先写入同目录下的临时文件，再原子地重命名为目标文件，
+    进程中途崩溃时不会留下写了一半的输出文件
+    """
+    fd, temp_path = create_temp_output(output_path)
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(temp_path, output_path)
+    except BaseException:
+        with contextlib.suppress(OSError):
+            os.remove(temp_path)
+        raise
+
+class _PositionTracker:
+    """
+    为不可定位的输出流（管道）记录已写出的字节数，tarfile 和 zipfile 写入时需要 tell()
+    """
+    def __init__(self, fileobj):
+        self.fileobj = fileobj
+        self.position = 0
+
+    def write(self, data):
+        self.fileobj.write(data)
+        self.position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self.position
+
+    def flush(self):
+        self.fileobj.flush()
+
+class ArchiveWriter:
+    """
+    将分割结果依次写成 tar 或 zip 归档流，输出流不需要可定位（可以是标准输出的管道）。
+    每个部分完成后立即写出并刷新，下游可以边接收边处理。zip 成员不再压缩，PDF 内的流已经压缩过
+    """
+    def __init__(self, fileobj, archive_format="tar"):
+        self.fileobj = _PositionTracker(fileobj)
+        if archive_format == "tar":
+            self.archive = tarfile.open(fileobj=self.fileobj, mode="w", format=tarfile.PAX_FORMAT)
+        else:
+            self.archive = zipfile.ZipFile(self.fileobj, "w", zipfile.ZIP_STORED)
+        self.archive_format = archive_format
+
+    def add(self, output_path, data):
+        """
+        以输出路径的文件名写入一个成员，参数与 write_atomic 相同，可作为 PartWriter 的写出函数
+        """
+        name = os.path.basename(output_path)
+        if self.archive_format == "tar":
+            info = tarfile.TarInfo(name)
+            info.size = len(data)
+            info.mtime = int(time.time())
+            info.mode = 0o644
+            self.archive.addfile(info, BytesIO(data))
+        else:
+            self.archive.writestr(zipfile.ZipInfo(name, time.localtime()[:6]), bytes(data))
+        self.fileobj.flush()
+
+    def close(self):
+        self.archive.close()
+        self.fileobj.flush()
+
+def read_archive_inputs(fileobj, archive_format="tar"):
+    """
+    从 tar 或 zip 归档流中按成员顺序读取所有 .pdf 文件，返回内存中的输入列表。
+    tar 可以边读边解析（支持 gzip 等压缩）；zip 的目录在末尾，需要先完整读入内存
+    """
+    inputs = []
+    if archive_format == "tar":
+        with tarfile.open(fileobj=fileobj, mode="r|*") as archive:
+            for member in archive:
+                if member.isfile() and member.name.lower().endswith(".pdf"):
+                    buffer = BytesIO(archive.extractfile(member).read())
+                    buffer.name = member.name
+                    inputs.append(buffer)
+    else:
+        with zipfile.ZipFile(BytesIO(fileobj.read())) as archive:
+            for info in archive.infolist():
+                if not info.is_dir() and info.filename.lower().endswith(".pdf"):
+                    buffer = BytesIO(archive.read(info))
+                    buffer.name = info.filename
+                    inputs.append(buffer)
+    return inputs
+
+def report_part(output_pdf_path, size, pruned_bytes=0, progress=""):
+    """
+    输出一个已生成部分的路径和大小，清理了未使用资源时同时输出估算节省的字节数
+    """
+    file_size = size / (1024 * 1024)  # 转换为MB
+    details = f"大小: {file_size:.2f} MB"
+    if pruned_bytes:
+        details += f", 清理未使用资源节省: {pruned_bytes / (1024 * 1024):.2f} MB"
+    print(f"生成文件: {output_pdf_path} ({details}){progress}")
+
+class PartWriter:
+    """
+    分割结果的后台写出线程。主线程把序列化好的部分放入有界队列后即可继续构建下一部分，
+    磁盘写入与构建重叠进行；队列满时主线程等待，内存中最多只有 max_pending 个待写部分。
+    每个部分写完后按提交顺序调用 on_written(输出路径, 字节数)，并产生 part_written 进度事件。
+    write_part(输出路径, 数据) 负责实际写出，默认原子地写入文件，也可以写入归档流
+    """
+    def __init__(self, on_written=None, max_pending=2, profiler=None, write_part=write_atomic, progress=None):
+        self.on_written = on_written
+        self.write_part = write_part
+        self.profiler = profiler or NullProfiler()
+        self.progress = progress or NullProgress()
+        self.queue = queue.Queue(maxsize=max_pending)
+        self.error = None
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def _run(self):
+        while True:
+            item = self.queue.get()
+            if item is None:
+                return
+            if self.error is not None:
+                continue  # 出错后丢弃剩余部分，只等待结束
+            output_path, buffer = item
+            try:
+                data = buffer.getbuffer()
+                with self.profiler.phase("write"):
+                    self.write_part(output_path, data)
+                self.profiler.count("bytes_written", len(data))
+                if self.on_written:
+                    self.on_written(output_path, len(data))
+                pages = getattr(buffer, "page_count", 0)
+                self.progress.emit("part_written", done_pages=pages, done_bytes=len(data), path=output_path,
+                                   pages=pages, size_bytes=len(data))
+            except Exception as e:
+                self.error = e
+
+    def submit(self, output_path, buffer):
+        """
+        提交一个已序列化到 BytesIO 的部分
+        """
+        if self.error is not None:
+            raise self.error
+        self.queue.put((output_path, buffer))
+
+    def close(self):
+        """
+        等待所有已提交的部分写完，写出过程中的异常在这里抛出
+        """
+        self.queue.put(None)
+        self.thread.join()
+        if self.error is not None:
+            raise self.error
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            # 主线程已出错：仍等待已提交的完整部分写完，但保留原始异常
+            self.queue.put(None)
+            self.thread.join()
+        return False
+
+class JobJournal:
+    """
+    长时间分割或合并作业的检查点日志，与输出文件放在一起。
+    第一行记录作业参数，之后每写完一个部分追加一行，记录其页面范围（或输入文件）、大小和校验和。
+    resume 为 True 且作业参数相同时读取已有记录，否则删除旧日志重新开始。
+    日志文件在记录第一条时才创建，输入无法打开等在写出任何部分前失败的作业不会留下日志
+    """
+    def __init__(self, path, job, resume=False):
+        self.path = path
+        # 经过一次 JSON 往返，元组等与日志中读回的值可以直接比较
+        self.job = json.loads(json.dumps(job))
+        self.entries = {}
+        self.pending = {}
+        self.lock = threading.Lock()
+        self.started = False
+        if resume and not self._load():
+            print("没有可继续的检查点（或作业参数已改变），从头开始。")
+        if self.entries:
+            self.started = True
+        else:
+            with contextlib.suppress(FileNotFoundError):
+                os.remove(self.path)
+
+    def _load(self):
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                lines = f.read().splitlines()
+        except OSError:
+            return False
+        try:
+            if not lines or json.loads(lines[0]).get("job") != self.job:
+                return False
+        except ValueError:
+            return False
+        for line in lines[1:]:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                break  # 中断时写了一半的最后一行
+            self.entries[record.pop("key")] = record
+        return True
+
+    def _append(self, key, record):
+        with self.lock:
+            self.entries[key] = record
+            with open(self.path, "a", encoding="utf-8") as f:
+                if not self.started:
+                    f.write(json.dumps({"job": self.job}, ensure_ascii=False) + "\n")
+                    self.started = True
+                f.write(json.dumps({"key": key, **record}, ensure_ascii=False) + "\n")
+
+    def verified(self, output_path, **expected):
+        """
+        output_path 在日志中有记录、记录的字段与 expected 相同，且磁盘上的文件大小和校验和都与记录一致时
+        返回该记录，否则返回 None
+        """
+        entry = self.entries.get(os.path.basename(output_path))
+        if entry is None or any(entry.get(name) != value for name, value in expected.items()):
+            return None
+        try:
+            if os.path.getsize(output_path) != entry["size"] or file_sha256(output_path) != entry["sha256"]:
+                return None
+        except OSError:
+            return None
+        return entry
+
+    def add(self, output_path, size, sha256, **fields):
+        """
+        记录一个已完整写出的文件
+        """
+        self._append(os.path.basename(output_path), {"size": size, "sha256": sha256, **fields})
+
+    def note(self, key, **fields):
+        """
+        记录作业的进度状态，同名的状态以最后一条为准
+        """
+        self._append(key, fields)
+
+    def expect(self, output_path, **fields):
+        """
+        登记即将交给写出线程的部分，写完后连同这些字段一起记录
+        """
+        with self.lock:
+            self.pending[output_path] = fields
+
+    def write_part(self, output_path, data):
+        """
+        PartWriter 的写出函数：原子地写入文件后追加日志记录
+        """
+        write_atomic(output_path, data)
+        with self.lock:
+            fields = self.pending.pop(output_path, {})
+        self.add(output_path, len(data), hashlib.sha256(data).hexdigest(), **fields)
+
+    def finish(self):
+        """
+        作业成功完成后删除日志
+        """
+        with contextlib.suppress(OSError):
+            os.remove(self.path)
+
+def open_split_journal(input_pdf_path, output_dir, write_part, resume=False, **job):
+    """
+    为写出到文件的分割作业打开检查点日志，job 为决定分割结果的参数。
+    输入文件的路径、大小和修改时间也记入作业参数，源文件改变后不会继续旧的作业。
+    内存中的输入或写出到归档流时没有可继续的输出，返回 None
+    """
+    if not is_path(input_pdf_path) or write_part is not write_atomic:
+        return None
+    stat = os.stat(input_pdf_path)
+    job.update(input=os.path.abspath(input_pdf_path), size=stat.st_size, mtime_ns=stat.st_mtime_ns)
+    return JobJournal(split_journal_path(input_pdf_path, output_dir), job, resume)
+
+def split_journal_path(input_pdf_path, output_dir):
+    base_name = os.path.splitext(os.path.basename(input_pdf_path))[0]
+    return os.path.join(output_dir, f".{base_name}.split-journal")
+
+def resume_planned_parts(journal, planned, progress=None):
+    """
+    planned 为按顺序排列的 (输出路径, 起始页, 结束页) 列表。返回日志中范围相同且校验通过的
+    {输出路径: 字节数}，其余部分登记到日志中等待写出
+    """
+    progress = progress or NullProgress()
+    done = {}
+    if journal is None:
+        return done
+    for output_pdf_path, start, end in planned:
+        entry = journal.verified(output_pdf_path, start=start, end=end)
+        if entry is not None:
+            done[output_pdf_path] = entry["size"]
+            progress.emit("part_resumed", path=output_pdf_path, pages=end - start, size_bytes=entry["size"])
+        else:
+            journal.expect(output_pdf_path, start=start, end=end)
+    if done:
+        print(f"继续上次中断的分割: 跳过 {len(done)} 个已完成并校验通过的部分")
+    return done
+
+def ordered_parts(planned, done, written):
+    """
+    按计划顺序合并跳过的部分与本次写出的部分，返回 (输出路径, 字节数) 列表
+    """
+    sizes = dict(done)
+    sizes.update(written)
+    return [(output_pdf_path, sizes[output_pdf_path]) for output_pdf_path, _, _ in planned]
+
+def split_pdf_by_pages(input_pdf_path, output_dir, pages_per_split, jobs=1, profiler=None, input_mode="default",
+                       save_profile="default", write_part=write_atomic, prune=False, resume=False, progress=None):
+    """
+    按页数分割PDF，每个输出文件包含指定数量的页面
+    jobs 大于 1 时由多个进程并行写出各部分。返回 (输出路径, 字节数) 列表
+    profiler 用于收集各阶段耗时（并行模式下只统计主进程），save_profile 为输出文件的保存配置，
+    write_part 为各部分的写出函数。内存中的输入或写出到归档流时总是在当前进程中分割。
+    prune 为 True 时删除每个部分中页面内容未引用的资源。
+    resume 为 True 时跳过检查点日志中已完成且校验通过的部分，progress 接收结构化进度事件
+    """
+    profiler = profiler or NullProfiler()
+    progress = progress or NullProgress()
+    if jobs > 1 and is_path(input_pdf_path) and write_part is write_atomic:
+        with profiler.phase("parallel_split"):
+            return split_pdf_by_pages_parallel(input_pdf_path, output_dir, pages_per_split, jobs, input_mode,
+                                               save_profile, prune, resume, progress)
+
+    parts = []
+    pruned = {}  # 输出路径 -> 清理未使用资源节省的字节数
+
+    def on_written(output_pdf_path, size):
+        parts.append((output_pdf_path, size))
+        report_part(output_pdf_path, size, pruned.pop(output_pdf_path, 0))
+
+    journal = open_split_journal(input_pdf_path, output_dir, write_part, resume, mode="pages",
+                                 pages_per_split=pages_per_split, save_profile=save_profile, prune=prune)
+    with profiler.phase("open"):
+        pdf = open_source_pdf(input_pdf_path, input_mode)
+    with pdf:
+        total_pages = len(pdf.pages)
+        planned = [(get_output_file_name(input_pdf_path, output_dir, f"{i // pages_per_split + 1}"),
+                    i, min(i + pages_per_split, total_pages))
+                   for i in range(0, total_pages, pages_per_split)]
+        progress.emit("job_started", kind="split", input=source_name(input_pdf_path),
+                      total_pages=sum(end - start for _, start, end in planned))
+        done = resume_planned_parts(journal, planned, progress)
+        if journal is not None:
+            write_part = journal.write_part
+
+        with PartWriter(on_written, profiler=profiler, write_part=write_part, progress=progress) as writer:
+            for split_count, (output_pdf_path, start, end) in enumerate(planned, 1):
+                if output_pdf_path in done:
+                    continue
+                progress.emit("part_started", part=split_count, start_page=start + 1, end_page=end)
+                # 构建并序列化下一部分的同时，上一部分由写出线程写入磁盘
+                buffer = save_page_range(pdf, start, end, profiler, "final_save", save_profile, prune)
+                profiler.count("parts")
+                submit_part(writer, output_pdf_path, buffer, pruned, profiler)
+
+    if journal is not None:
+        journal.finish()
+    parts = ordered_parts(planned, done, parts)
+    progress.emit("job_finished", kind="split", parts=len(parts))
+    return parts
+
+# 工作进程中打开的源PDF（每个进程只打开一次）和主进程取消作业时设置的停止事件
+_worker_pdf = None
+_worker_stop = None
+
+def _init_split_worker(input_pdf_path, input_mode, stop_event=None):
+    global _worker_pdf, _worker_stop
+    _worker_pdf = open_source_pdf(input_pdf_path, input_mode)
+    _worker_stop = stop_event
+
+def _write_page_ranges(input_pdf_path, output_dir, ranges, save_profile="default", prune=False):
+    """
+    在工作进程中写出一批页面范围，ranges 为 (序号, 起始页, 结束页) 列表，主进程设置停止事件后不再开始新的部分。
+    返回 (输出路径, 字节数, 清理未使用资源节省的字节数, SHA-256) 列表，检查点日志由主进程记录
+    """
+    results = []
+    pruned = {}
+    digests = {}
+
+    def write_part(output_pdf_path, data):
+        write_atomic(output_pdf_path, data)
+        digests[output_pdf_path] = hashlib.sha256(data).hexdigest()
+
+    def on_written(output_pdf_path, size):
+        results.append((output_pdf_path, size, pruned.pop(output_pdf_path, 0), digests.pop(output_pdf_path)))
+
+    with PartWriter(on_written, write_part=write_part) as writer:
+        for split_index, start, end in ranges:
+            if _worker_stop is not None and _worker_stop.is_set():
+                break
+            buffer = save_page_range(_worker_pdf, start, end, save_profile=save_profile, prune=prune)
+            output_pdf_path = get_output_file_name(input_pdf_path, output_dir, f"{split_index}")
+            submit_part(writer, output_pdf_path, buffer, pruned)
+    return results
+
+def split_pdf_by_pages_parallel(input_pdf_path, output_dir, pages_per_split, jobs, input_mode="default",
+                                save_profile="default", prune=False, resume=False, progress=None):
+    """
+    按页数分割PDF，由 jobs 个进程并行写出互不重叠的页面范围。
+    输出文件名只由范围序号决定，与完成顺序无关；进度在主进程中汇总输出，
+    进度事件只有各部分写完时的 part_written。返回按序号排列的 (输出路径, 字节数) 列表
+    """
+    progress = progress or NullProgress()
+    journal = open_split_journal(input_pdf_path, output_dir, write_atomic, resume, mode="pages",
+                                 pages_per_split=pages_per_split, save_profile=save_profile, prune=prune)
+    with open_source_pdf(input_pdf_path, input_mode) as pdf:
+        total_pages = len(pdf.pages)
+
+    planned = [(get_output_file_name(input_pdf_path, output_dir, f"{i // pages_per_split + 1}"),
+                i, min(i + pages_per_split, total_pages))
+               for i in range(0, total_pages, pages_per_split)]
+    progress.emit("job_started", kind="split", input=source_name(input_pdf_path), total_pages=total_pages)
+    done = resume_planned_parts(journal, planned, progress)
+    ranges = [(split_index, start, end) for split_index, (output_pdf_path, start, end) in enumerate(planned, 1)
+              if output_pdf_path not in done]
+    spans = {output_pdf_path: (start, end) for output_pdf_path, start, end in planned}
+
+    # 批次数多于进程数，使负载更均衡，进度也能更及时地汇总
+    batch_count = min(len(ranges), jobs * 4)
+    batch_size = -(-len(ranges) // batch_count) if batch_count else 1
+    batches = [ranges[k:k + batch_size] for k in range(0, len(ranges), batch_size)]
+
+    parts = {}
+    stop_event = multiprocessing.Event()
+    with concurrent.futures.ProcessPoolExecutor(max_workers=jobs, initializer=_init_split_worker,
+                             initargs=(input_pdf_path, input_mode, stop_event)) as executor:
+        futures = [executor.submit(_write_page_ranges, input_pdf_path, output_dir, batch, save_profile, prune)
+                   for batch in batches]
+        try:
+            for future in as_completed(futures):
+                for output_pdf_path, size, pruned_bytes, sha256 in future.result():
+                    parts[output_pdf_path] = size
+                    start, end = spans[output_pdf_path]
+                    journal.add(output_pdf_path, size, sha256, start=start, end=end)
+                    report_part(output_pdf_path, size, pruned_bytes, f" [{len(parts)}/{len(ranges)}]")
+                    progress.emit("part_written", done_pages=end - start, done_bytes=size, path=output_pdf_path,
+                                  pages=end - start, size_bytes=size)
+        except BaseException:
+            # 取消或出错时不再启动排队中的批次，正在执行的批次写完当前部分后停止。
+            # 等它们结束后才抛出，调用方收到异常后不会再有文件写出；已写完的部分记入日志，之后可以继续
+            stop_event.set()
+            executor.shutdown(wait=True, cancel_futures=True)
+            for future in futures:
+                if future.done() and not future.cancelled() and future.exception() is None:
+                    for output_pdf_path, size, _, sha256 in future.result():
+                        if output_pdf_path not in parts:
+                            start, end = spans[output_pdf_path]
+                            journal.add(output_pdf_path, size, sha256, start=start, end=end)
+            raise
+
+    journal.finish()
+    parts = ordered_parts(planned, done, parts)
+    progress.emit("job_finished", kind="split", parts=len(parts))
+    return parts
+
+# 内容流中引用资源名称的操作符，以及按名称引用的资源类型
+RESOURCE_OPERATORS = "Tf Do gs cs CS scn SCN sh BDC DP"
+NAMED_RESOURCE_TYPES = {'/Font', '/XObject', '/ExtGState', '/ColorSpace', '/Pattern', '/Shading', '/Properties'}
+
+def used_resource_names(page):
+    """
+    扫描页面内容流，返回作为资源名称使用的名称集合；内容流无法解析时返回 None（视为全部资源都被使用）
+    """
+    try:
+        instructions = pikepdf.parse_content_stream(page, RESOURCE_OPERATORS)
+    except pikepdf.PdfError:
+        return None
+    return {str(operand) for operands, _ in instructions for operand in operands
+            if isinstance(operand, pikepdf.Name)}
+
+def collect_page_objects(page_obj, used_names=None, found=None):
+    """
+    收集一个页面可达的所有间接对象，返回 {objgen: 对象}。
+    与 pikepdf 复制页面时一致，不跟随 /Parent，也不跨越到其他页面对象。
+    used_names 不为空时，页面资源字典中只跟随内容流引用到的资源。
+    传入 found 时结果累加到其中，已收集过的共享对象不再重复遍历
+    """
+    found = {} if found is None else found
+    found[page_obj.objgen] = page_obj
+    stack = []
+    for key, value in page_obj.items():
+        if key == '/Parent':
+            continue
+        if key == '/Resources' and used_names is not None and isinstance(value, pikepdf.Dictionary):
+            if value.is_indirect:
+                found[value.objgen] = value
+            for resource_type, entries in value.items():
+                if resource_type in NAMED_RESOURCE_TYPES and isinstance(entries, pikepdf.Dictionary):
+                    if entries.is_indirect:
+                        found[entries.objgen] = entries
+                    stack.extend(entry for name, entry in entries.items() if name in used_names)
+                else:
+                    stack.append(entries)
+        else:
+            stack.append(value)
+
+    while stack:
+        obj = stack.pop()
+        if not isinstance(obj, pikepdf.Object):
+            continue
+        if obj.is_indirect:
+            objgen = obj.objgen
+            if objgen in found:
+                continue
+            if obj.get('/Type') == pikepdf.Name.Page:
+                continue
+            found[objgen] = obj
+        if isinstance(obj, pikepdf.Stream):
+            stack.extend(value for key, value in obj.stream_dict.items() if key != '/Parent')
+        elif isinstance(obj, pikepdf.Dictionary):
+            stack.extend(value for key, value in obj.items() if key != '/Parent')
+        elif isinstance(obj, pikepdf.Array):
+            stack.extend(obj)
+    return found
+
+def prune_unused_resources(pdf):
+    """
+    删除每页资源字典中内容流未引用的字体、图片、表单等资源，不再被引用的对象保存时不会写出。
+    由 qpdf 扫描内容流判断；被多页共享的资源字典会先复制再修改，不影响其他页面和源文档。
+    返回估算节省的字节数
+    """
+    before = {}
+    for page in pdf.pages:
+        collect_page_objects(page.obj, found=before)
+    for page in pdf.pages:
+        page.remove_unreferenced_resources()
+    after = {}
+    for page in pdf.pages:
+        collect_page_objects(page.obj, found=after)
+    return sum(estimate_object_size(obj) for objgen, obj in before.items() if objgen not in after)
+
+def submit_part(writer, output_pdf_path, buffer, pruned, profiler=None):
+    """
+    将一个部分交给写出线程，并记录清理未使用资源节省的字节数，供写出后输出
+    """
+    pruned_bytes = getattr(buffer, "pruned_bytes", 0)
+    if pruned_bytes:
+        pruned[output_pdf_path] = pruned_bytes
+        (profiler or NullProfiler()).count("bytes_pruned", pruned_bytes)
+    writer.submit(output_pdf_path, buffer)
+
+def _indirect_references(obj):
+    """
+    返回对象直接引用的间接对象（穿过其中的直接字典和数组）。
+    与 collect_page_objects 一致，不跟随 /Parent，也不包括其他页面对象
+    """
+    if isinstance(obj, pikepdf.Stream):
+        stack = [value for key, value in obj.stream_dict.items() if key != '/Parent']
+    elif isinstance(obj, pikepdf.Dictionary):
+        stack = [value for key, value in obj.items() if key != '/Parent']
+    elif isinstance(obj, pikepdf.Array):
+        stack = list(obj)
+    else:
+        return []
+    references = []
+    while stack:
+        value = stack.pop()
+        if not isinstance(value, pikepdf.Object):
+            continue
+        if value.is_indirect:
+            if value.get('/Type') != pikepdf.Name.Page:
+                references.append(value)
+        elif isinstance(value, pikepdf.Dictionary):
+            stack.extend(item for key, item in value.items() if key != '/Parent')
+        elif isinstance(value, pikepdf.Array):
+            stack.extend(value)
+    return references
+
+class PageSizeIndex:
+    """
+    页面大小索引：一次遍历对象图，记录每页独占的字节数以及被多页共享的对象（字体、图片、XObject 等），
+    通过前缀和加共享对象并集来估算任意页面范围输出后的字节数。
+    整个文档只遍历一次，每个对象只展开一次：对象归第一个到达它的页面所有，之后的页面再次到达时
+    记为共享并停止展开；共享对象可达的对象也都是共享的。
+    prune 为 True 时估算清理未使用资源之后的大小，每页只计入其内容流引用到的资源
+    """
+    BASE_OVERHEAD = 1024  # 文件头、页面树、trailer 等固定开销
+
+    def __init__(self, pdf, prune=False):
+        owner = {}         # 对象 -> 第一个到达它的页面
+        sizes = {}         # 对象 -> 字节数
+        children = {}      # 已展开的对象 -> 它直接引用的对象
+        revisited = set()  # 被第二个页面到达的对象
+        hits = []          # 每页到达的、属于更早页面的对象
+
+        def reach(obj, page_num, page_hits, expand=True):
+            """
+            记录页面到达了对象 obj；obj 第一次被展开时返回它直接引用的对象，否则返回空列表
+            """
+            objgen = obj.objgen
+            if objgen not in owner:
+                owner[objgen] = page_num
+                sizes[objgen] = estimate_object_size(obj)
+            elif owner[objgen] != page_num:
+                revisited.add(objgen)
+                page_hits.add(objgen)
+            if not expand or objgen in children:
+                return []
+            references = _indirect_references(obj)
+            children[objgen] = [reference.objgen for reference in references]
+            return references
+
+        for page_num, page in enumerate(pdf.pages):
+            page_hits = set()
+            hits.append(page_hits)
+            page_obj = page.obj
+            used_names = used_resource_names(page) if prune else None
+            resources = page_obj.get('/Resources')
+            if used_names is None or not isinstance(resources, pikepdf.Dictionary):
+                stack = reach(page_obj, page_num, page_hits)
+            else:
+                # 页面资源字典中只跟随内容流引用到的资源，资源字典本身只计入大小
+                reach(page_obj, page_num, page_hits, expand=False)
+                stack = [value for key, value in page_obj.items() if key not in ('/Parent', '/Resources')]
+                if resources.is_indirect:
+                    reach(resources, page_num, page_hits, expand=False)
+                for resource_type, entries in resources.items():
+                    if resource_type in NAMED_RESOURCE_TYPES and isinstance(entries, pikepdf.Dictionary):
+                        if entries.is_indirect:
+                            reach(entries, page_num, page_hits, expand=False)
+                        stack.extend(entry for name, entry in entries.items() if name in used_names)
+                    else:
+                        stack.append(entries)
+
+            while stack:
+                obj = stack.pop()
+                if not isinstance(obj, pikepdf.Object):
+                    continue
+                if obj.is_indirect:
+                    if obj.get('/Type') != pikepdf.Name.Page:
+                        stack.extend(reach(obj, page_num, page_hits))
+                elif isinstance(obj, pikepdf.Dictionary):
+                    stack.extend(value for key, value in obj.items() if key != '/Parent')
+                elif isinstance(obj, pikepdf.Array):
+                    stack.extend(obj)
+
+        shared = set()
+        stack = list(revisited)
+        while stack:
+            objgen = stack.pop()
+            if objgen not in shared:
+                shared.add(objgen)
+                stack.extend(children.get(objgen, ()))
+
+        # prefix[i] 为前 i 页独占字节数之和，shared[i] 为第 i 页直接到达的共享对象
+        exclusive = [0] * len(hits)
+        self.shared = [list(page_hits) for page_hits in hits]
+        for objgen, page_num in owner.items():
+            if objgen in shared:
+                self.shared[page_num].append(objgen)
+            else:
+                exclusive[page_num] += sizes[objgen]
+        self.prefix = [0]
+        for size in exclusive:
+            self.prefix.append(self.prefix[-1] + size)
+        self.object_sizes = {objgen: sizes[objgen] for objgen in shared}
+        self.children = {objgen: children.get(objgen, ()) for objgen in shared}
+
+    def _add_shared(self, page, seen):
+        """
+        将第 page 页可达的共享对象加入 seen，返回新加入对象的字节数之和
+        """
+        added = 0
+        stack = list(self.shared[page])
+        while stack:
+            objgen = stack.pop()
+            if objgen not in seen:
+                seen.add(objgen)
+                added += self.object_sizes[objgen]
+                stack.extend(self.children[objgen])
+        return added
+
+    def estimate(self, start, end):
+        """
+        估算页面范围 [start, end) 输出后的字节数
+        """
+        seen = set()
+        shared = sum(self._add_shared(page, seen) for page in range(start, end))
+        return self.BASE_OVERHEAD + self.prefix[end] - self.prefix[start] + shared
+
+    def fit(self, start, limit):
+        """
+        返回最大的结束页 end（至少为 start + 1），使范围 [start, end) 的估算大小不超过 limit。
+        从 start 开始按倍增的步长向后探测，共享对象的并集随页面逐页累加，并记下每个结束页的估算大小；
+        超限后在最后一步中二分。代价与该部分的页数成正比，与文档剩余的页数无关
+        """
+        total_pages = len(self.shared)
+        seen = set()
+        sizes = []  # sizes[k] 为范围 [start, start + k + 1) 的估算大小，随 k 单调不减
+        size = self.BASE_OVERHEAD
+        step = 1
+        while start + len(sizes) < total_pages and size <= limit:
+            for page in range(start + len(sizes), min(start + len(sizes) + step, total_pages)):
+                size += self.prefix[page + 1] - self.prefix[page] + self._add_shared(page, seen)
+                sizes.append(size)
+            step *= 2
+        return start + max(bisect.bisect_right(sizes, limit), 1)
+
+def save_page_range(pdf, start, end, profiler=None, phase="probe_save", save_profile="default", prune=False):
+    """
+    将页面范围 [start, end) 按保存配置保存到内存缓冲区并返回
+    profiler 不为空时，复制页面与保存分别计入 copy_pages 和 phase 阶段。
+    prune 为 True 时保存前删除未使用的资源，估算节省的字节数记录在缓冲区的 pruned_bytes 属性中
+    """
+    profiler = profiler or NullProfiler()
+    with profiler.phase("copy_pages"):
+        temp_pdf = pikepdf.Pdf.new()
+        for page_num in range(start, end):
+            temp_pdf.pages.append(pdf.pages[page_num])
+    pruned_bytes = 0
+    if prune:
+        with profiler.phase("prune"):
+            pruned_bytes = prune_unused_resources(temp_pdf)
+
+    # 使用 BytesIO 作为内存中的临时文件
+    temp_buffer = BytesIO()
+    with profiler.phase(phase):
+        save_pdf(temp_pdf, temp_buffer, save_profile)
+    profiler.count("bytes_serialized", temp_buffer.tell())
+    temp_buffer.pruned_bytes = pruned_bytes
+    temp_buffer.page_count = end - start
+    return temp_buffer
+
+def confirm_split_boundary(pdf, start, estimated_end, total_pages, max_size, cache=None, profiler=None,
+                           save_profile="default", prune=False, progress=None):
+    """
+    用实际保存确认索引估算出的分割边界。
+    估算准确时只需两次保存（估算边界本身，以及多一页时确认已超限）；
+    估算偏大时在其左侧二分，估算偏小时向右倍增探测后再二分。
+    cache 中已有的范围大小直接使用，不再保存。大小按 save_profile 保存（以及 prune 清理）后的结果计算。
+    每次确认产生一个 probe_save 进度事件。返回最终边界及其保存结果
+    """
+    progress = progress or NullProgress()
+    # 最近一次实际保存且可能成为最终结果的 (结束页, 缓冲区)。
+    # 两个探测阶段中满足限制的结束页都是递增的，因此最后一个满足限制的保存就是最终边界
+    kept = [None, None]
+
+    def fits(end):
+        size = cache.get(start, end) if cache is not None else None
+        cached = size is not None
+        if size is None:
+            buffer = save_page_range(pdf, start, end, profiler, save_profile=save_profile, prune=prune)
+            size = buffer.tell()
+            if cache is not None:
+                cache.put(start, end, size)
+            if size <= max_size or end == start + 1:
+                kept[:] = [end, buffer]
+        progress.emit("probe_save", start_page=start + 1, end_page=end, size_bytes=size, cached=cached)
+        return size <= max_size
+
+    if not fits(estimated_end):
+        best = start + 1  # 至少包含一页
+        # 单页即超限时这一页仍然单独成为一个部分
+        low, high = start + 1, estimated_end - 1
+    else:
+        best = estimated_end
+        low, high = 1, 0  # 一直探测到最后一页都满足限制时无需再二分
+        step = 1
+        while best < total_pages:
+            probe = min(best + step, total_pages)
+            if not fits(probe):
+                low, high = best + 1, probe - 1
+                break
+            best = probe
+            step *= 2
+
+    while low <= high:
+        mid = (low + high) // 2
+        if fits(mid):
+            best = mid
+            low = mid + 1
+        else:
+            high = mid - 1
+
+    end, buffer = kept
+    if end != best:
+        buffer = save_page_range(pdf, start, best, profiler, "final_save", save_profile, prune)
+    return best, buffer
+
+class MeasurementCache:
+    """
+    页面范围大小的持久化缓存。以输入文件内容的哈希、保存选项以及 pikepdf 和 qpdf 的版本为键，每个键一个 JSON 文件，
+    记录已实际测量过的 (起始页, 结束页) -> 字节数。缓存目录总大小超过上限时按最近使用时间淘汰
+    """
+    def __init__(self, input_pdf_path, cache_dir=None, max_cache_mb=64, save_options=None):
+        self.cache_dir = cache_dir or default_cache_dir()
+        self.max_bytes = max_cache_mb * 1024 * 1024
+        options = json.dumps(save_options or {}, sort_keys=True)
+        # 缓存的大小代替实际保存，升级后序列化方式可能改变，旧的测量结果会使部分超过大小上限
+        versions = f"{pikepdf.__version__}:{pikepdf.__libqpdf_version__}"
+        key = hashlib.sha256(f"{file_sha256(input_pdf_path)}:{options}:{versions}".encode()).hexdigest()
+        self.path = os.path.join(self.cache_dir, f"{key}.json")
+        self.ranges = {}
+        self.dirty = False
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                self.ranges = json.load(f).get("ranges", {})
+            os.utime(self.path)  # 记录最近使用时间
+        except (OSError, ValueError):
+            pass
+
+    def get(self, start, end):
+        return self.ranges.get(f"{start}-{end}")
+
+    def put(self, start, end, size):
+        self.ranges[f"{start}-{end}"] = size
+        self.dirty = True
+
+    def save(self):
+        """
+        写回缓存文件并按上限淘汰最久未使用的缓存文件
+        """
+        if not self.dirty:
+            return
+        os.makedirs(self.cache_dir, exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump({"ranges": self.ranges}, f)
+        os.replace(temp_path, self.path)
+        self.dirty = False
+        self.evict()
+
+    def evict(self):
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            if name.endswith(".json"):
+                try:
+                    stat = os.stat(os.path.join(self.cache_dir, name))
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, name))
+        total = sum(size for _, size, _ in entries)
+        for _, size, name in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            path = os.path.join(self.cache_dir, name)
+            if path != self.path:
+                # 其他进程可能同时在淘汰同一个文件
+                with contextlib.suppress(OSError):
+                    os.remove(path)
+                total -= size
+
+def default_cache_dir():
+    """
+    默认缓存目录：$PDF_SPLIT_CACHE_DIR，否则为 $XDG_CACHE_HOME/pdf-split（默认 ~/.cache/pdf-split）
+    """
+    if os.environ.get("PDF_SPLIT_CACHE_DIR"):
+        return os.environ["PDF_SPLIT_CACHE_DIR"]
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(base, "pdf-split")
+
+def file_sha256(path, chunk_size=1024 * 1024):
+    if not is_path(path):
+        return hashlib.sha256(path.getbuffer()).hexdigest()
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def split_pdf_by_size(input_pdf_path, output_dir, max_size_mb, use_cache=True, cache_dir=None, max_cache_mb=64,
+                      profiler=None, input_mode="default", save_profile="default", write_part=write_atomic,
+                      prune=False, resume=False, progress=None):
+    """
+    按文件大小分割PDF，确保每个输出文件大小不超过指定的最大值
+    先在页面大小索引上从当前页向后探测估算边界，只用少量实际保存来确认最终边界。
+    use_cache 为 True 时实际测量的范围大小保存在持久化缓存中，再次分割同一文件时直接复用。
+    不同保存配置的输出大小不同，缓存按保存配置分别记录。prune 为 True 时删除每个部分中未使用的资源，
+    索引也只计入页面实际引用的资源。
+    resume 为 True 时从检查点日志中已完成且校验通过的连续部分之后继续，已确认的边界不再重新测量。
+    profiler 用于收集各阶段耗时，write_part 为各部分的写出函数，progress 接收结构化进度事件。
+    返回 (输出路径, 字节数) 列表
+    """
+    profiler = profiler or NullProfiler()
+    progress = progress or NullProgress()
+    parts = []
+    pruned = {}  # 输出路径 -> 清理未使用资源节省的字节数
+
+    def on_written(output_pdf_path, size):
+        parts.append((output_pdf_path, size))
+        report_part(output_pdf_path, size, pruned.pop(output_pdf_path, 0))
+
+    with profiler.phase("cache_load"):
+        # 默认配置不写入键，已有的缓存继续有效
+        save_options = {}
+        if save_profile != "default":
+            save_options["save_profile"] = save_profile
+        if prune:
+            save_options["prune"] = True
+        cache = MeasurementCache(input_pdf_path, cache_dir, max_cache_mb, save_options) if use_cache else None
+    journal = open_split_journal(input_pdf_path, output_dir, write_part, resume, mode="size",
+                                 max_size_mb=max_size_mb, save_profile=save_profile, prune=prune)
+    if journal is not None:
+        write_part = journal.write_part
+
+    split_count = 1
+    current_page = 0
+    resumed = []  # (输出路径, 页数, 字节数)
+    if journal is not None:
+        # 每个部分的起始页由前一部分决定，只能从连续的已完成部分之后继续
+        while True:
+            output_pdf_path = get_output_file_name(input_pdf_path, output_dir, f"{split_count}")
+            entry = journal.verified(output_pdf_path, start=current_page)
+            if entry is None:
+                break
+            parts.append((output_pdf_path, entry["size"]))
+            resumed.append((output_pdf_path, entry["end"] - current_page, entry["size"]))
+            split_count += 1
+            current_page = entry["end"]
+        if parts:
+            print(f"继续上次中断的分割: 跳过 {len(parts)} 个已完成并校验通过的部分，从第 {current_page + 1} 页继续")
+
+    with profiler.phase("open"):
+        pdf = open_source_pdf(input_pdf_path, input_mode)
+    with pdf, PartWriter(on_written, profiler=profiler, write_part=write_part, progress=progress) as writer:
+        total_pages = len(pdf.pages)
+        max_size = max_size_mb * 1024 * 1024
+        progress.emit("job_started", kind="split", input=source_name(input_pdf_path), total_pages=total_pages)
+        for output_pdf_path, pages, size in resumed:
+            progress.emit("part_resumed", path=output_pdf_path, pages=pages, size_bytes=size)
+        with profiler.phase("size_index"):
+            index = PageSizeIndex(pdf, prune)
+
+        while current_page < total_pages:
+            progress.emit("part_started", part=split_count, start_page=current_page + 1)
+            with profiler.phase("size_estimate"):
+                best = index.fit(current_page, max_size)
+
+            best, temp_buffer = confirm_split_boundary(pdf, current_page, best, total_pages, max_size, cache, profiler,
+                                                       save_profile, prune, progress)
+            profiler.count("parts")
+
+            # 确认时的保存结果即为最终文件内容，交给写出线程写入磁盘，同时开始确定下一部分
+            output_pdf_path = get_output_file_name(input_pdf_path, output_dir, f"{split_count}")
+            if journal is not None:
+                journal.expect(output_pdf_path, start=current_page, end=best)
+            submit_part(writer, output_pdf_path, temp_buffer, pruned, profiler)
+
+            split_count += 1
+            current_page = best
+
+    if cache is not None:
+        with profiler.phase("cache_save"):
+            cache.save()
+    if journal is not None:
+        journal.finish()
+    progress.emit("job_finished", kind="split", parts=len(parts))
+    return parts
+
+def _greedy_page_ranges(index, total_pages, limit):
+    """
+    从第一页开始，每个部分在估算大小不超过 limit 的前提下包含尽可能多的页面（至少一页）
+    """
+    ranges = []
+    start = 0
+    while start < total_pages:
+        end = index.fit(start, limit)
+        ranges.append((start, end))
+        start = end
+    return ranges
+
+def balanced_page_ranges(total_pages, parts, index=None):
+    """
+    将页面划分为 parts 个连续范围。index 为 None 时按页数平均划分；
+    否则按页面大小索引的估算，选择使最大部分尽可能小的边界：
+    二分查找最小的大小上限，使按该上限贪心划分得到的部分数不超过 parts。
+    部分数不足时继续对半拆分页数最多的部分，拆分不会使最大部分变大。返回 [起始页, 结束页) 列表
+    """
+    if parts < 1:
+        raise ValueError(f"部分数必须大于0: {parts}")
+    if total_pages == 0:
+        return []  # 与按页数分割相同，没有页面时不产生部分
+    parts = min(parts, total_pages)
+    if index is None:
+        base, extra = divmod(total_pages, parts)
+        ranges = []
+        start = 0
+        for k in range(parts):
+            end = start + base + (1 if k < extra else 0)
+            ranges.append((start, end))
+            start = end
+        return ranges
+
+    low = max(index.estimate(page, page + 1) for page in range(total_pages))
+    high = index.estimate(0, total_pages)
+    while low < high:
+        mid = (low + high) // 2
+        if len(_greedy_page_ranges(index, total_pages, mid)) <= parts:
+            high = mid
+        else:
+            low = mid + 1
+    ranges = _greedy_page_ranges(index, total_pages, low)
+
+    while len(ranges) < parts:
+        k = max(range(len(ranges)), key=lambda k: ranges[k][1] - ranges[k][0])
+        start, end = ranges[k]
+        middle = (start + end) // 2
+        ranges[k:k + 1] = [(start, middle), (middle, end)]
+    return ranges
+
+def split_pdf_into_parts(input_pdf_path, output_dir, parts, balance="size", profiler=None, input_mode="default",
+                         save_profile="default", write_part=write_atomic, prune=False, resume=False,
+                         progress=None):
+    """
+    将PDF分割为恰好 parts 个部分（页数少于 parts 时每页一个部分），适用于分发给固定数量的下游工作进程。
+    balance 为 size 时按页面大小索引估算的字节数均衡，使最大的部分尽可能小；为 pages 时按页数均衡。
+    prune 为 True 时删除每个部分中未使用的资源，resume 为 True 时跳过已完成的部分，
+    progress 接收结构化进度事件。返回 (输出路径, 字节数) 列表
+    """
+    profiler = profiler or NullProfiler()
+    progress = progress or NullProgress()
+    parts_written = []
+    pruned = {}  # 输出路径 -> 清理未使用资源节省的字节数
+
+    def on_written(output_pdf_path, size):
+        parts_written.append((output_pdf_path, size))
+        report_part(output_pdf_path, size, pruned.pop(output_pdf_path, 0))
+
+    journal = open_split_journal(input_pdf_path, output_dir, write_part, resume, mode="parts", parts=parts,
+                                 balance=balance, save_profile=save_profile, prune=prune)
+    with profiler.phase("open"):
+        pdf = open_source_pdf(input_pdf_path, input_mode)
+    with pdf:
+        total_pages = len(pdf.pages)
+        index = None
+        if balance == "size":
+            with profiler.phase("size_index"):
+                index = PageSizeIndex(pdf, prune)
+        with profiler.phase("balance"):
+            ranges = balanced_page_ranges(total_pages, parts, index)
+        planned = [(get_output_file_name(input_pdf_path, output_dir, f"{split_count}"), start, end)
+                   for split_count, (start, end) in enumerate(ranges, 1)]
+        progress.emit("job_started", kind="split", input=source_name(input_pdf_path),
+                      total_pages=sum(end - start for _, start, end in planned))
+        done = resume_planned_parts(journal, planned, progress)
+        if journal is not None:
+            write_part = journal.write_part
+
+        with PartWriter(on_written, profiler=profiler, write_part=write_part, progress=progress) as writer:
+            for split_count, (output_pdf_path, start, end) in enumerate(planned, 1):
+                if output_pdf_path in done:
+                    continue
+                progress.emit("part_started", part=split_count, start_page=start + 1, end_page=end)
+                buffer = save_page_range(pdf, start, end, profiler, "final_save", save_profile, prune)
+                profiler.count("parts")
+                submit_part(writer, output_pdf_path, buffer, pruned, profiler)
+
+    if journal is not None:
+        journal.finish()
+    parts_written = ordered_parts(planned, done, parts_written)
+    progress.emit("job_finished", kind="split", parts=len(parts_written))
+    if parts_written:
+        sizes = [size for _, size in parts_written]
+        print(f"最大部分: {max(sizes) / (1024 * 1024):.2f} MB, 最小部分: {min(sizes) / (1024 * 1024):.2f} MB")
+    return parts_written
+
+def parse_page_ranges(spec, total_pages):
+    """
+    解析页面范围表达式，例如 "1-10,11-40,41-"。页码从1开始，"41-" 表示到最后一页，
+    "-10" 表示从第一页开始，单个数字表示单页。返回从0开始的 [起始页, 结束页) 列表
+    """
+    ranges = []
+    for item in spec.split(","):
+        item = item.strip()
+        if not item:
+            continue
+        try:
+            if "-" in item:
+                first, last = item.split("-", 1)
+                first = int(first) if first.strip() else 1
+                last = int(last) if last.strip() else total_pages
+            else:
+                first = last = int(item)
+        except ValueError:
+            raise ValueError(f"无效的页面范围: {item}")
+        if not (1 <= first <= total_pages and 1 <= last <= total_pages):
+            raise ValueError(f"页面范围超出文档页数 ({total_pages} 页): {item}")
+        if first > last:
+            raise ValueError(f"页面范围的起始页大于结束页: {item}")
+        ranges.append((first - 1, last))
+    if not ranges:
+        raise ValueError("页面范围为空")
+    return ranges
+
+def _resolve_destination_page(pdf, dest, page_numbers):
+    """
+    将书签目标（页面引用数组、命名目标或 /D 字典）解析为从0开始的页码，无法解析时返回 None
+    """
+    if isinstance(dest, (pikepdf.Name, pikepdf.String, str)):
+        name = str(dest)
+        dest = None
+        if "/Names" in pdf.Root and "/Dests" in pdf.Root.Names:
+            dests = pikepdf.NameTree(pdf.Root.Names.Dests)
+            if name in dests:
+                dest = dests[name]
+        elif "/Dests" in pdf.Root and name in pdf.Root.Dests:
+            dest = pdf.Root.Dests[name]
+    if isinstance(dest, pikepdf.Dictionary):
+        dest = dest.get("/D")
+    if isinstance(dest, pikepdf.Array) and len(dest) > 0:
+        target = dest[0]
+        if isinstance(target, pikepdf.Object) and target.is_indirect:
+            return page_numbers.get(target.objgen)
+        if isinstance(target, int) and 0 <= target < len(page_numbers):
+            return target
+    return None
+
+def outline_page_ranges(pdf):
+    """
+    按文档大纲的顶层书签划分页面范围，每个书签从其目标页开始，到下一个书签的目标页之前结束。
+    第一个书签之前的页面并入第一个部分。返回 (书签标题, 起始页, 结束页) 列表
+    """
+    page_numbers = {page.obj.objgen: number for number, page in enumerate(pdf.pages)}
+    starts = []
+    with pdf.open_outline() as outline:
+        for item in outline.root:
+            dest = item.destination
+            if dest is None and item.action is not None and item.action.get("/S") == pikepdf.Name.GoTo:
+                dest = item.action.get("/D")
+            page_number = _resolve_destination_page(pdf, dest, page_numbers)
+            if page_number is not None:
+                starts.append((page_number, item.title))
+
+    # 去掉目标页相同的重复书签，保留第一个
+    starts.sort(key=lambda start: start[0])
+    unique = []
+    for page_number, title in starts:
+        if not unique or unique[-1][0] != page_number:
+            unique.append((page_number, title))
+
+    ranges = []
+    for k, (page_number, title) in enumerate(unique):
+        start = 0 if k == 0 else page_number
+        end = unique[k + 1][0] if k + 1 < len(unique) else len(pdf.pages)
+        ranges.append((title, start, end))
+    return ranges
+
+def split_pdf_by_ranges(input_pdf_path, output_dir, ranges_spec=None, by_outline=False, profiler=None,
+                        input_mode="default", save_profile="default", write_part=write_atomic, prune=False,
+                        resume=False, progress=None):
+    """
+    一次打开源文件，按页面范围表达式或顶层书签生成多个输出文件。
+    所有输出共享同一个已解析的源文档，不需要为每个范围重新打开和解析。
+    write_part 为各部分的写出函数，prune 为 True 时删除每个部分中未使用的资源，
+    resume 为 True 时跳过已完成的部分，progress 接收结构化进度事件。返回 (输出路径, 字节数) 列表
+    """
+    profiler = profiler or NullProfiler()
+    progress = progress or NullProgress()
+    parts = []
+    pruned = {}  # 输出路径 -> 清理未使用资源节省的字节数
+
+    def on_written(output_pdf_path, size):
+        parts.append((output_pdf_path, size))
+        report_part(output_pdf_path, size, pruned.pop(output_pdf_path, 0))
+
+    with profiler.phase("open"):
+        pdf = open_source_pdf(input_pdf_path, input_mode)
+    with pdf:
+        total_pages = len(pdf.pages)
+        if by_outline:
+            outline_ranges = outline_page_ranges(pdf)
+            if not outline_ranges:
+                print("文档没有可用的顶层书签。")
+                return parts
+            for split_count, (title, start, end) in enumerate(outline_ranges, 1):
+                print(f"书签 {split_count}: {title} (第 {start + 1}-{end} 页)")
+            ranges = [(start, end) for _, start, end in outline_ranges]
+        else:
+            ranges = parse_page_ranges(ranges_spec, total_pages)
+
+        # 书签或范围表达式不同时各部分不同，日志以解析出的范围为作业参数
+        journal = open_split_journal(input_pdf_path, output_dir, write_part, resume, mode="ranges",
+                                     ranges=ranges, save_profile=save_profile, prune=prune)
+        planned = [(get_output_file_name(input_pdf_path, output_dir, f"{split_count}"), start, end)
+                   for split_count, (start, end) in enumerate(ranges, 1)]
+        progress.emit("job_started", kind="split", input=source_name(input_pdf_path),
+                      total_pages=sum(end - start for _, start, end in planned))
+        done = resume_planned_parts(journal, planned, progress)
+        if journal is not None:
+            write_part = journal.write_part
+
+        with PartWriter(on_written, profiler=profiler, write_part=write_part, progress=progress) as writer:
+            for split_count, (output_pdf_path, start, end) in enumerate(planned, 1):
+                if output_pdf_path in done:
+                    continue
+                progress.emit("part_started", part=split_count, start_page=start + 1, end_page=end)
+                buffer = save_page_range(pdf, start, end, profiler, "final_save", save_profile, prune)
+                profiler.count("parts")
+                submit_part(writer, output_pdf_path, buffer, pruned, profiler)
+
+    if journal is not None:
+        journal.finish()
+    parts = ordered_parts(planned, done, parts)
+    progress.emit("job_finished", kind="split", parts=len(parts))
+    return parts
+
+# 参与去重的非流对象类型，流对象（图片、表单 XObject、字体文件等）总是参与去重
+DEDUP_DICT_TYPES = {'/Font', '/FontDescriptor', '/Encoding', '/ExtGState'}
+
+def _dedup_key(obj):
+    """
+    计算对象的内容哈希，不参与去重的对象返回 None
+    """
+    if isinstance(obj, pikepdf.Stream):
+        # /Length 可能是各源文件中不同的间接引用，内容相同则长度必然相同，因此不计入
+        stream_dict = pikepdf.Dictionary({key: value for key, value in obj.stream_dict.items() if key != '/Length'})
+        digest = hashlib.sha256(b'stream')
+        digest.update(stream_dict.unparse(resolved=True))
+        digest.update(obj.read_raw_bytes())
+        return digest.digest()
+    if isinstance(obj, pikepdf.Dictionary) and str(obj.get('/Type')) in DEDUP_DICT_TYPES:
+        return hashlib.sha256(b'dict' + obj.unparse(resolved=True)).digest()
+    return None
+
+def _replace_references(container, remap):
+    """
+    将容器（含嵌套的直接对象）中指向重复对象的引用替换为保留的对象
+    """
+    if isinstance(container, pikepdf.Array):
+        entries = enumerate(list(container))
+    elif isinstance(container, (pikepdf.Dictionary, pikepdf.Stream)):
+        entries = list(container.items())
+    else:
+        return
+    for key, value in entries:
+        if not isinstance(value, pikepdf.Object):
+            continue
+        if value.is_indirect:
+            if value.objgen in remap:
+                container[key] = remap[value.objgen]
+        else:
+            _replace_references(value, remap)
+
+def deduplicate_resources(pdf):
+    """
+    按内容哈希合并字节相同的字体、图片和表单 XObject 等对象，只保留一份。
+    引用替换后字体字典等可能变得相同，因此重复进行直到没有新的重复对象。
+    返回估算节省的字节数
+    """
+    saved = 0
+    # 已被替换的对象不再被引用，保存时不会写出，但仍留在 pdf.objects 中，需要跳过
+    removed = set()
+    while True:
+        canonical = {}
+        remap = {}
+        for obj in pdf.objects:
+            if not isinstance(obj, pikepdf.Object) or obj.objgen in removed:
+                continue
+            key = _dedup_key(obj)
+            if key is None:
+                continue
+            if key in canonical:
+                remap[obj.objgen] = canonical[key]
+                saved += estimate_object_size(obj)
+            else:
+                canonical[key] = obj
+        if not remap:
+            return saved
+
+        removed.update(remap)
+        for obj in pdf.objects:
+            if isinstance(obj, pikepdf.Object) and obj.objgen not in removed:
+                _replace_references(obj, remap)
+        _replace_references(pdf.trailer, remap)
+
+def check_merge_input(input_pdf, input_mode="default"):
+    """
+    打开一个合并输入并读取页面树，返回错误说明，输入有效时返回 None。
+    只解析 xref 和页面树，页面内容在合并时才读取
+    """
+    if is_path(input_pdf) and not os.path.isfile(input_pdf):
+        return "文件不存在"
+    try:
+        with open_source_pdf(input_pdf, input_mode) as pdf:
+            if len(pdf.pages) == 0:
+                # 没有页面的输入仍然有效，合并时不添加任何页面
+                print(f"注意: {source_name(input_pdf)} 没有页面")
+    except pikepdf.PasswordError:
+        return "文件已加密，需要密码"
+    except (pikepdf.PdfError, OSError) as e:
+        return f"无法打开: {e}"
+    return None
+
+def validate_merge_inputs(input_pdf_paths, input_mode="default", workers=8):
+    """
+    合并开始前由线程池并发检查所有输入，一次报告全部无效的输入，
+    避免合并了很长时间后才因第一个无效文件中止。返回 (输入, 错误说明) 列表
+    """
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        errors = list(executor.map(lambda pdf_path: check_merge_input(pdf_path, input_mode), input_pdf_paths))
+    invalid = [(pdf_path, error) for pdf_path, error in zip(input_pdf_paths, errors) if error]
+    for pdf_path, error in invalid:
+        print(f"无效的输入: {source_name(pdf_path)} ({error})")
+    if invalid:
+        print(f"共有 {len(invalid)} 个无效的输入，未开始合并。")
+    return invalid
+
+def _open_for_merge(input_pdf, input_mode):
+    pdf = open_source_pdf(input_pdf, input_mode)
+    # 在后台线程中读取页面树，追加页面时不再等待解析
+    len(pdf.pages)
+    return pdf
+
+def prefetch_pdfs(input_pdf_paths, input_mode="default", depth=4, profiler=None):
+    """
+    按输入顺序产生已打开的 (输入, Pdf)，由调用方关闭。后台线程提前打开之后的 depth 个输入，
+    解析文件、修复 xref 与向合并结果追加当前输入的页面重叠进行，输入位于慢速存储上时不再逐个等待。
+    depth 为 0 时不预取。profiler 的 open 阶段只统计主线程等待打开的时间
+    """
+    profiler = profiler or NullProfiler()
+    if depth < 1:
+        for pdf_path in input_pdf_paths:
+            with profiler.phase("open"):
+                pdf = _open_for_merge(pdf_path, input_mode)
+            yield pdf_path, pdf
+        return
+
+    remaining = iter(input_pdf_paths)
+    pending = deque()
+    with ThreadPoolExecutor(max_workers=depth) as executor:
+        try:
+            for pdf_path in remaining:
+                pending.append((pdf_path, executor.submit(_open_for_merge, pdf_path, input_mode)))
+                if len(pending) >= depth:
+                    break
+            while pending:
+                pdf_path, future = pending.popleft()
+                with profiler.phase("open"):
+                    pdf = future.result()
+                for next_path in remaining:
+                    pending.append((next_path, executor.submit(_open_for_merge, next_path, input_mode)))
+                    break
+                yield pdf_path, pdf
+        finally:
+            # 提前结束（出错或调用方不再迭代）时关闭已预取但未交出的文件
+            for _, future in pending:
+                if not future.cancel():
+                    with contextlib.suppress(Exception):
+                        future.result().close()
+
+def merge_pdfs(input_pdf_paths, output_dir, output_file_name=None, dedup=False, profiler=None, input_mode="default",
+               save_profile="default", output_stream=None, prefetch=4, progress=None):
+    """
+    合并多个PDF文件为一个
+    dedup 为 True 时在保存前合并各输入间字节相同的共享资源，profiler 用于收集各阶段耗时，
+    save_profile 为输出文件的保存配置。输入可以是内存中的PDF；output_stream 不为空时
+    合并结果直接写入该二进制流（可以是管道），不写文件。
+    开始前检查所有输入并一次报告全部无效的输入，合并时后台提前打开之后的 prefetch 个输入。
+    progress 接收结构化进度事件，吞吐量按已合并的输入字节数计算。
+    返回输出文件路径，输入无效或写入流时返回 None
+    """
+    profiler = profiler or NullProfiler()
+    progress = progress or NullProgress()
+    if not input_pdf_paths:
+        print("没有提供要合并的PDF文件。")
+        return
+
+    with profiler.phase("validate"):
+        if validate_merge_inputs(input_pdf_paths, input_mode):
+            return
+
+    progress.emit("job_started", kind="merge", files=len(input_pdf_paths),
+                  total_bytes=sum(source_size(pdf_path) for pdf_path in input_pdf_paths))
+    merged_pdf = pikepdf.Pdf.new()
+
+    for pdf_path, pdf in prefetch_pdfs(input_pdf_paths, input_mode, prefetch, profiler):
+        pages = len(pdf.pages)
+        with pdf, profiler.phase("copy_pages"):
+            merged_pdf.pages.extend(pdf.pages)
+        emit_file_merged(progress, pdf_path, pages)
+
+    if dedup:
+        with profiler.phase("dedup"):
+            saved = deduplicate_resources(merged_pdf)
+        print(f"去重节省: {saved / (1024 * 1024):.2f} MB")
+
+    if output_stream is not None:
+        with profiler.phase("final_save"):
+            save_pdf(merged_pdf, output_stream, save_profile)
+        output_stream.flush()
+        print("合并结果已写出到输出流")
+        progress.emit("job_finished", kind="merge", output=None)
+        return None
+    
+    if not output_file_name:
+        first_base = os.path.splitext(os.path.basename(source_name(input_pdf_paths[0])))[0]
+        output_file_name = f"{first_base}_merge.pdf"
+    
+    output_path = os.path.join(output_dir, output_file_name)
+    with profiler.phase("final_save"):
+        save_pdf(merged_pdf, output_path, save_profile)
+    
+    size = os.path.getsize(output_path)
+    profiler.count("bytes_written", size)
+    file_size = size / (1024 * 1024)  # 转换为MB
+    print(f"合并后的文件: {output_path} (大小: {file_size:.2f} MB)")
+    progress.emit("job_finished", kind="merge", output=output_path, size_bytes=size)
+    return output_path
+
+def emit_file_merged(progress, pdf_path, pages):
+    """
+    产生合并完一个输入的 file_merged 事件，该输入的页数和字节数计入吞吐量
+    """
+    size = source_size(pdf_path)
+    progress.emit("file_merged", done_pages=pages, done_bytes=size, path=source_name(pdf_path), pages=pages,
+                  size_bytes=size)
+
+def get_peak_rss_mb():
+    """
+    返回当前进程的峰值常驻内存 (MB)，平台不支持时返回 None
+    """
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # macOS 上单位为字节，Linux 上为 KB
+    if sys.platform == "darwin":
+        return peak / (1024 * 1024)
+    return peak / 1024
+
+def plan_merge_batches(input_pdf_paths, memory_budget_mb, max_open_files):
+    """
+    将输入文件按顺序划分为批次，每批的输入总大小不超过内存预算，文件数不超过打开句柄上限。
+    单个文件超过预算时独占一批
+    """
+    budget = memory_budget_mb * 1024 * 1024
+    batches = []
+    current, current_size = [], 0
+    for pdf_path in input_pdf_paths:
+        size = os.path.getsize(pdf_path)
+        if current and (len(current) >= max_open_files or current_size + size > budget):
+            batches.append(current)
+            current, current_size = [], 0
+        current.append(pdf_path)
+        current_size += size
+    if current:
+        batches.append(current)
+    return batches
+
+def merge_batch(input_pdf_paths, output_path, dedup=False, profiler=None, phase="final_save", input_mode="default",
+                save_profile="default", prefetch=4, progress=None):
+    """
+    将一批PDF按顺序合并并按保存配置保存到 output_path，返回去重节省的字节数。
+    后台提前打开之后的 prefetch 个输入，progress 不为空时每合并一个输入产生一个 file_merged 事件
+    """
+    profiler = profiler or NullProfiler()
+    merged_pdf = pikepdf.Pdf.new()
+    for pdf_path, pdf in prefetch_pdfs(input_pdf_paths, input_mode, prefetch, profiler):
+        pages = len(pdf.pages)
+        with pdf, profiler.phase("copy_pages"):
+            merged_pdf.pages.extend(pdf.pages)
+        if progress is not None:
+            emit_file_merged(progress, pdf_path, pages)
+    saved = 0
+    if dedup:
+        with profiler.phase("dedup"):
+            saved = deduplicate_resources(merged_pdf)
+    with profiler.phase(phase):
+        save_pdf(merged_pdf, output_path, save_profile)
+    merged_pdf.close()
+    profiler.count("bytes_written", os.path.getsize(output_path))
+    return saved
+
+@functools.lru_cache(maxsize=4096)
+def _name_bytes(name):
+    return pikepdf.Name(name).unparse()
+
+def _has_indirect(value):
+    """
+    直接对象（含嵌套的数组和字典）中是否有间接引用
+    """
+    if not isinstance(value, pikepdf.Object):
+        return False
+    if value.is_indirect:
+        return True
+    if isinstance(value, pikepdf.Array):
+        return any(_has_indirect(item) for item in value)
+    if isinstance(value, pikepdf.Dictionary):
+        return any(_has_indirect(item) for _, item in value.items())
+    return False
+
+class StreamingPdfWriter:
+    """
+    不在内存中保留整个文档地写出合并结果：逐个读入已合并好的批次文件，把其页面可达的对象重新编号后
+    依次写到输出文件，写完一个批次即可关闭它。内存中只保留每个对象在文件中的偏移（每个对象 8 字节）
+    和当前批次的编号映射，峰值内存只取决于单个批次，不随输入总量增长。
+    每个批次的页面挂在一个中间 /Pages 节点下，流按原始（已编码）数据复制，输出使用普通的交叉引用表。
+    dedup 为 True 时跨批次合并内容相同、且不引用其他对象的流和字体等字典（批次内的重复对象在合并批次时已去除）
+    """
+    def __init__(self, fileobj, dedup=False):
+        self.f = fileobj
+        self.dedup = dedup
+        # 0 号对象不使用，1 号为文档目录，2 号为页面树根节点
+        self.offsets = array("Q", [0, 0, 0])
+        self.nodes = []
+        self.page_count = 0
+        self.version = "1.3"
+        self.canonical = {}  # 内容哈希 -> 已写出的对象编号
+        self.saved = 0
+        self.f.write(b"%PDF-1.3\n%\xbf\xf7\xa2\xfe\n")
+
+    def _new_number(self):
+        self.offsets.append(0)
+        return len(self.offsets) - 1
+
+    def _begin_object(self, num):
+        self.offsets[num] = self.f.tell()
+        self.f.write(b"%d 0 obj\n" % num)
+
+    def _leaf_key(self, obj):
+        # 引用其他对象的对象在不同批次中的编号不可比较，只对不含引用的对象去重
+        if isinstance(obj, pikepdf.Stream):
+            if any(_has_indirect(value) for key, value in obj.stream_dict.items() if key != "/Length"):
+                return None
+        elif not isinstance(obj, pikepdf.Dictionary) or any(_has_indirect(value) for _, value in obj.items()):
+            return None
+        return _dedup_key(obj)
+
+    def _unparse(self, value, ref):
+        if isinstance(value, pikepdf.Object):
+            if value.is_indirect:
+                return b"%d 0 R" % ref(value)
+            if isinstance(value, pikepdf.Dictionary):
+                return self._unparse_items(value.items(), ref)
+            if isinstance(value, pikepdf.Array):
+                return b"[ " + b" ".join(self._unparse(item, ref) for item in value) + b" ]"
+            return value.unparse()
+        # pikepdf 把数值、布尔值和 null 转换为 Python 的值
+        if value is None:
+            return b"null"
+        if isinstance(value, bool):
+            return b"true" if value else b"false"
+        if isinstance(value, int):
+            return b"%d" % value
+        if isinstance(value, Decimal):
+            return format(value, "f").encode()
+        return format(Decimal(repr(value)), "f").encode()
+
+    def _unparse_items(self, items, ref):
+        return b"<< " + b" ".join(_name_bytes(key) + b" " + self._unparse(value, ref) for key, value in items) + b" >>"
+
+    def _write_object(self, num, obj, ref, parent=None):
+        self._begin_object(num)
+        if isinstance(obj, pikepdf.Stream):
+            data = obj.read_raw_bytes()
+            items = [(key, value) for key, value in obj.stream_dict.items() if key != "/Length"]
+            self.f.write(self._unparse_items(items, ref)[:-2] + b"/Length %d >>\nstream\n" % len(data))
+            self.f.write(data)
+            self.f.write(b"\nendstream\nendobj\n")
+            return
+        if isinstance(obj, pikepdf.Dictionary):
+            items = obj.items()
+            if parent is not None:
+                items = [(key, value) for key, value in items if key != "/Parent"]
+            body = self._unparse_items(items, ref)
+            if parent is not None:
+                body = body[:-2] + b"/Parent %d 0 R >>" % parent
+        elif isinstance(obj, pikepdf.Array):
+            body = b"[ " + b" ".join(self._unparse(item, ref) for item in obj) + b" ]"
+        else:
+            body = obj.unparse(resolved=True)
+        self.f.write(body + b"\nendobj\n")
+
+    def add_pdf(self, pdf):
+        """
+        写出一个批次文件中的全部页面及其引用的对象，返回页数。
+        批次文件由 qpdf 合并生成，页面树只有一层，可继承的属性已下推到各页面
+        """
+        node = self._new_number()
+        # 指向批次文件目录和页面树根节点的引用改为指向输出的目录和这一批的中间节点
+        numbers = {pdf.Root.objgen: 1, pdf.Root.Pages.objgen: node}
+        pending = deque()
+
+        def ref(obj):
+            num = numbers.get(obj.objgen)
+            if num is None:
+                key = self._leaf_key(obj) if self.dedup else None
+                num = self.canonical.get(key) if key is not None else None
+                if num is not None:
+                    self.saved += estimate_object_size(obj)
+                else:
+                    num = self._new_number()
+                    pending.append((num, obj))
+                    if key is not None:
+                        self.canonical[key] = num
+                numbers[obj.objgen] = num
+            return num
+
+        kids = [ref(page.obj) for page in pdf.pages]
+        page_numbers = set(kids)
+        # 编号在第一次遇到引用时分配，按分配顺序写出
+        while pending:
+            num, obj = pending.popleft()
+            self._write_object(num, obj, ref, node if num in page_numbers else None)
+
+        self._begin_object(node)
+        self.f.write(b"<< /Type /Pages /Parent 2 0 R /Count %d /Kids [ " % len(kids)
+                     + b" ".join(b"%d 0 R" % num for num in kids) + b" ] >>\nendobj\n")
+        self.nodes.append(node)
+        self.page_count += len(kids)
+        self.version = max(self.version, str(pdf.pdf_version))
+        return len(kids)
+
+    def finish(self):
+        """
+        写出页面树根节点、文档目录、交叉引用表和尾部字典，返回总页数
+        """
+        self._begin_object(2)
+        self.f.write(b"<< /Type /Pages /Count %d /Kids [ " % self.page_count
+                     + b" ".join(b"%d 0 R" % num for num in self.nodes) + b" ] >>\nendobj\n")
+        self._begin_object(1)
+        self.f.write(b"<< /Type /Catalog /Pages 2 0 R >>\nendobj\n")
+
+        xref_offset = self.f.tell()
+        self.f.write(b"xref\n0 %d\n0000000000 65535 f \n" % len(self.offsets))
+        for offset in self.offsets[1:]:
+            self.f.write(b"%010d 00000 n \n" % offset)
+        file_id = b"<" + os.urandom(16).hex().encode() + b">"
+        self.f.write(b"trailer\n<< /Size %d /Root 1 0 R /ID [ %s %s ] >>\nstartxref\n%d\n%%%%EOF\n"
+                     % (len(self.offsets), file_id, file_id, xref_offset))
+        # 文件头的版本取各批次中最高的
+        if len(self.version) == 3:
+            self.f.seek(5)
+            self.f.write(self.version.encode())
+            self.f.seek(0, os.SEEK_END)
+        return self.page_count
+
+def merge_pdfs_streaming(input_pdf_paths, output_dir, output_file_name=None, memory_budget_mb=256, max_open_files=64,
+                         dedup=False, profiler=None, input_mode="default", save_profile="default", resume=False,
+                         prefetch=4, progress=None):
+    """
+    以有限内存合并大量PDF文件：按内存预算和句柄上限将输入分批合并为临时批次文件，
+    再由 StreamingPdfWriter 逐个读入批次文件，把对象直接写到输出文件。
+    任何时候内存中只有一个批次的页面对象，峰值内存由内存预算决定，不随输入总量增长。
+    dedup 为 True 时每一批都进行资源去重，写出时再跨批次合并不引用其他对象的重复资源。
+    批次文件的流按 save_profile 压缩（web 按 default），流式写出的输出不生成对象流，也不线性化；
+    输入只有一批时直接按 save_profile 保存。
+    批次文件和检查点日志放在输出目录中，中断后 resume 为 True 时跳过已完成且校验通过的批次。
+    开始前检查所有输入，合并每一批时后台提前打开之后的 prefetch 个输入（不超过句柄上限）。
+    progress 接收结构化进度事件。返回输出文件路径，输入无效时返回 None
+    """
+    profiler = profiler or NullProfiler()
+    progress = progress or NullProgress()
+    if not input_pdf_paths:
+        print("没有提供要合并的PDF文件。")
+        return
+
+    with profiler.phase("validate"):
+        # 检查时同时打开的文件数同样不超过 max_open_files
+        if validate_merge_inputs(input_pdf_paths, input_mode, workers=max(1, min(8, max_open_files))):
+            return
+    # 预取的文件与正在追加的文件同时打开
+    prefetch = min(prefetch, max_open_files - 1)
+    progress.emit("job_started", kind="merge", files=len(input_pdf_paths),
+                  total_bytes=sum(os.path.getsize(pdf_path) for pdf_path in input_pdf_paths))
+
+    if not output_file_name:
+        first_base = os.path.splitext(os.path.basename(input_pdf_paths[0]))[0]
+        output_file_name = f"{first_base}_merge.pdf"
+    output_path = os.path.join(output_dir, output_file_name)
+
+    batches = plan_merge_batches(input_pdf_paths, memory_budget_mb, max_open_files)
+    if len(batches) == 1:
+        saved = merge_batch(batches[0], output_path, dedup, profiler, input_mode=input_mode,
+                            save_profile=save_profile, prefetch=prefetch, progress=progress)
+    else:
+        # 批次文件放在输出目录中，避免跨文件系统复制；目录名固定，中断后可以继续
+        spill_dir = os.path.abspath(os.path.join(output_dir, f".{output_file_name}.merge-spill"))
+        if not resume:
+            shutil.rmtree(spill_dir, ignore_errors=True)
+        os.makedirs(spill_dir, exist_ok=True)
+        inputs = []
+        for pdf_path in input_pdf_paths:
+            stat = os.stat(pdf_path)
+            inputs.append([os.path.abspath(pdf_path), stat.st_size, stat.st_mtime_ns])
+        journal = JobJournal(os.path.join(spill_dir, "journal"),
+                             {"inputs": inputs, "memory_budget_mb": memory_budget_mb, "max_open_files": max_open_files,
+                              "dedup": dedup, "save_profile": save_profile}, resume)
+
+        spill_profile = "default" if save_profile == "web" else save_profile
+        saved = 0
+        spilled = []
+        resumed = 0
+        for k, batch in enumerate(batches):
+            spill_path = os.path.join(spill_dir, f"batch{k}.pdf")
+            batch_inputs = [os.path.abspath(pdf_path) for pdf_path in batch]
+            entry = journal.verified(spill_path, inputs=batch_inputs)
+            if entry is not None:
+                saved += entry["saved"]
+                resumed += 1
+            else:
+                batch_saved = merge_batch(batch, spill_path, dedup, profiler, "spill_save", input_mode,
+                                          spill_profile, prefetch, progress)
+                saved += batch_saved
+                journal.add(spill_path, os.path.getsize(spill_path), file_sha256(spill_path),
+                            inputs=batch_inputs, saved=batch_saved)
+            spilled.append(spill_path)
+        skipped = f"（跳过 {resumed} 个已完成的批次）" if resumed else ""
+        print(f"{len(input_pdf_paths)} 个文件分为 {len(spilled)} 批合并{skipped}，逐批写出到输出文件")
+
+        fd, temp_path = create_temp_output(output_path)
+        try:
+            with os.fdopen(fd, "wb") as f, profiler.phase("stream_write"):
+                writer = StreamingPdfWriter(f, dedup)
+                for spill_path in spilled:
+                    with pikepdf.Pdf.open(spill_path) as pdf:
+                        writer.add_pdf(pdf)
+                writer.finish()
+            os.replace(temp_path, output_path)
+        except BaseException:
+            with contextlib.suppress(OSError):
+                os.remove(temp_path)
+            raise
+        saved += writer.saved
+        profiler.count("bytes_written", os.path.getsize(output_path))
+        shutil.rmtree(spill_dir, ignore_errors=True)
+
+    if dedup:
+        print(f"去重节省: {saved / (1024 * 1024):.2f} MB")
+
+    size = os.path.getsize(output_path)
+    file_size = size / (1024 * 1024)  # 转换为MB
+    print(f"合并后的文件: {output_path} (大小: {file_size:.2f} MB)")
+    progress.emit("job_finished", kind="merge", output=output_path, size_bytes=size)
+
+    peak_rss = get_peak_rss_mb()
+    if peak_rss is not None:
+        print(f"峰值内存: {peak_rss:.1f} MB")
+    return output_path
+
+# 尾部字典中记录增量追加次数的键，完整重写时删除
+APPEND_COUNT_KEY = "/PdfSplitAppends"
+
+# 页面树根节点上可被页面继承的属性：追加页面时 qpdf 会把它们下推到每个原有页面
+INHERITABLE_PAGE_KEYS = ("/Resources", "/MediaBox", "/CropBox", "/Rotate")
+
+def find_last_xref(path):
+    """
+    从文件末尾读取最后一个 startxref，返回 (交叉引用节的偏移, 是否为交叉引用流)，找不到时返回 None
+    """
+    with open(path, "rb") as f:
+        f.seek(0, os.SEEK_END)
+        f.seek(max(f.tell() - 2048, 0))
+        matches = re.findall(rb"startxref\s+(\d+)", f.read())
+        if not matches:
+            return None
+        offset = int(matches[-1])
+        f.seek(offset)
+        return offset, f.read(4) != b"xref"
+
+def incremental_append_blocker(bundle):
+    """
+    检查合并文件能否以增量更新方式追加，返回不能追加的原因，可以时返回 None。
+    追加页面时只有页面树根节点被修改，其余写出的都是新对象；页面树有多层或根节点带有可继承的属性时，
+    qpdf 会改动原有的页面对象，此时只能完整重写
+    """
+    if bundle.get_warnings():
+        return "文件有损坏，打开时经过修复"
+    pages = bundle.Root.Pages
+    if any(key in pages for key in INHERITABLE_PAGE_KEYS):
+        return "页面树根节点带有可继承的属性"
+    if any(kid.get("/Type") != pikepdf.Name.Page for kid in pages.Kids):
+        return "页面树不是单层的"
+    return None
+
+def collect_new_objects(roots, first_new):
+    """
+    从 roots 出发收集编号不小于 first_new 的间接对象（本次追加复制进来的对象），
+    遇到原有的间接对象时不再深入。返回 {objgen: 对象}
+    """
+    found = {}
+    stack = list(roots)
+    while stack:
+        obj = stack.pop()
+        if not isinstance(obj, pikepdf.Object):
+            continue
+        if obj.is_indirect:
+            if obj.objgen[0] < first_new or obj.objgen in found:
+                continue
+            found[obj.objgen] = obj
+        if isinstance(obj, pikepdf.Stream):
+            stack.extend(value for _, value in obj.stream_dict.items())
+        elif isinstance(obj, pikepdf.Dictionary):
+            stack.extend(value for _, value in obj.items())
+        elif isinstance(obj, pikepdf.Array):
+            stack.extend(obj)
+    return found
+
+def serialize_object(obj):
+    """
+    按PDF语法序列化一个间接对象的内容（不含 "n g obj"），流按原始（已编码）数据写出并重新填写 /Length
+    """
+    if not isinstance(obj, pikepdf.Stream):
+        return obj.unparse(resolved=True)
+    data = obj.read_raw_bytes()
+    stream_dict = pikepdf.Dictionary({key: value for key, value in obj.stream_dict.items() if key != "/Length"})
+    stream_dict.Length = len(data)
+    return stream_dict.unparse(resolved=True) + b"\nstream\n" + data + b"\nendstream"
+
+def _xref_subsections(numbers):
+    """
+    将有序的对象编号分为编号连续的段，返回 [[起始编号, 个数], ...]
+    """
+    sections = []
+    for num in numbers:
+        if sections and sections[-1][0] + sections[-1][1] == num:
+            sections[-1][1] += 1
+        else:
+            sections.append([num, 1])
+    return sections
+
+def _dictionary_bytes(fields):
+    return b"<< " + b" ".join(key + b" " + value for key, value in fields.items()) + b" >>"
+
+def build_incremental_update(objects, base_offset, size, trailer, xref_stream=False):
+    """
+    生成追加到文件末尾的增量更新：objects 中的对象、新的交叉引用节和尾部字典。
+    base_offset 为原文件的长度，size 为更新后的 /Size，trailer 为其余的尾部字典项（键和值均为已序列化的字节串）。
+    原文件最后的交叉引用节是交叉引用流时，新的交叉引用节也写为交叉引用流
+    """
+    out = BytesIO()
+    out.write(b"\n")
+    offsets = {}
+    for objgen in sorted(objects):
+        offsets[objgen] = base_offset + out.tell()
+        out.write(b"%d %d obj\n" % objgen + serialize_object(objects[objgen]) + b"\nendobj\n")
+
+    xref_offset = base_offset + out.tell()
+    if xref_stream:
+        # 交叉引用流本身也是一个新对象
+        offsets[(size, 0)] = xref_offset
+        size += 1
+    entries = sorted(offsets.items())
+    sections = _xref_subsections([num for (num, _), _ in entries])
+    fields = {b"/Size": b"%d" % size, **trailer}
+    if xref_stream:
+        width = max(4, (xref_offset.bit_length() + 7) // 8)
+        rows = b"".join(b"\x01" + offset.to_bytes(width, "big") + gen.to_bytes(2, "big")
+                        for (_, gen), offset in entries)
+        fields.update({b"/Type": b"/XRef", b"/W": b"[ 1 %d 2 ]" % width,
+                       b"/Index": b"[ " + b" ".join(b"%d %d" % tuple(section) for section in sections) + b" ]",
+                       b"/Length": b"%d" % len(rows)})
+        out.write(b"%d 0 obj\n" % (size - 1) + _dictionary_bytes(fields) + b"\nstream\n" + rows
+                  + b"\nendstream\nendobj\n")
+    else:
+        out.write(b"xref\n")
+        position = 0
+        for start, count in sections:
+            out.write(b"%d %d\n" % (start, count))
+            for (_, gen), offset in entries[position:position + count]:
+                out.write(b"%010d %05d n \n" % (offset, gen))
+            position += count
+        out.write(b"trailer\n" + _dictionary_bytes(fields) + b"\n")
+    out.write(b"startxref\n%d\n%%%%EOF\n" % xref_offset)
+    return out.getvalue()
+
+def write_incremental_update(bundle_path, base_size, update, expected_pages):
+    """
+    把增量更新追加到合并文件末尾，再重新打开文件核对页数。
+    写入或核对失败时截断回原来的长度，原有内容保持不变
+    """
+    with open(bundle_path, "r+b") as f:
+        f.seek(base_size)
+        try:
+            f.write(update)
+            f.flush()
+            os.fsync(f.fileno())
+            with pikepdf.Pdf.open(bundle_path) as check:
+                if len(check.pages) != expected_pages or check.get_warnings():
+                    raise ValueError(f"增量更新校验失败: {bundle_path}")
+        except BaseException:
+            f.truncate(base_size)
+            raise
+
+def append_pdfs(bundle_path, input_pdf_paths, rewrite_every=0, dedup=False, profiler=None, input_mode="default",
+                save_profile="default", prefetch=4, progress=None):
+    """
+    将输入追加到已有的合并文件 bundle_path 末尾。默认以增量更新方式追加：只在文件末尾写出本次复制进来的
+    新对象、修改后的页面树根节点和新的交叉引用节，原有内容不重写，耗时只与新增的页面有关。
+    合并文件已有 rewrite_every 次增量更新（0 表示从不）或无法增量追加时改为完整重写，丢弃被替换的旧对象
+    和历次交叉引用节，dedup 和 save_profile 只在完整重写时使用。合并文件不存在时按普通合并新建。
+    返回合并文件路径，输入无效时返回 None
+    """
+    profiler = profiler or NullProfiler()
+    progress = progress or NullProgress()
+    if not input_pdf_paths:
+        print("没有提供要追加的PDF文件。")
+        return
+    if not os.path.exists(bundle_path):
+        print(f"合并文件不存在，新建: {bundle_path}")
+        return merge_pdfs(input_pdf_paths, os.path.dirname(bundle_path) or ".", os.path.basename(bundle_path),
+                          dedup=dedup, profiler=profiler, input_mode=input_mode, save_profile=save_profile,
+                          prefetch=prefetch, progress=progress)
+
+    with profiler.phase("validate"):
+        if validate_merge_inputs([bundle_path] + list(input_pdf_paths), input_mode):
+            return
+
+    progress.emit("job_started", kind="append", files=len(input_pdf_paths),
+                  total_bytes=sum(source_size(pdf_path) for pdf_path in input_pdf_paths))
+    base_size = os.path.getsize(bundle_path)
+    temp_path = None
+    with profiler.phase("open"):
+        bundle = open_source_pdf(bundle_path, input_mode)
+    with bundle:
+        appends = int(bundle.trailer.get(APPEND_COUNT_KEY, 0))
+        old_pages = len(bundle.pages)
+        last_xref = find_last_xref(bundle_path)
+        reason = incremental_append_blocker(bundle) or (None if last_xref else "找不到 startxref")
+        if reason is None and rewrite_every and appends >= rewrite_every:
+            reason = f"已有 {appends} 次增量更新"
+
+        for pdf_path, pdf in prefetch_pdfs(input_pdf_paths, input_mode, prefetch, profiler):
+            pages = len(pdf.pages)
+            with pdf, profiler.phase("copy_pages"):
+                bundle.pages.extend(pdf.pages)
+            emit_file_merged(progress, pdf_path, pages)
+        total_pages = len(bundle.pages)
+        if total_pages == old_pages:
+            print(f"输入中没有页面，合并文件未修改: {bundle_path}")
+            progress.emit("job_finished", kind="append", output=bundle_path, size_bytes=0)
+            return bundle_path
+
+        if reason is None:
+            # 复制进来的对象从原有最大编号之后依次编号，第一个追加的页面编号最小
+            with profiler.phase("serialize"):
+                first_new = bundle.pages[old_pages].objgen[0]
+                pages_root = bundle.Root.Pages
+                objects = collect_new_objects(pages_root.Kids, first_new)
+                objects[pages_root.objgen] = pages_root
+                old_id = bundle.trailer.ID[0].unparse() if "/ID" in bundle.trailer else None
+                new_id = b"<" + os.urandom(16).hex().encode() + b">"
+                trailer = {b"/Root": bundle.trailer.Root.unparse(), b"/Prev": b"%d" % last_xref[0],
+                           b"/ID": b"[ " + (old_id or new_id) + b" " + new_id + b" ]",
+                           APPEND_COUNT_KEY.encode(): b"%d" % (appends + 1)}
+                if "/Info" in bundle.trailer:
+                    trailer[b"/Info"] = bundle.trailer.Info.unparse()
+                size = max(int(bundle.trailer.Size), max(num for num, _ in objects) + 1)
+                update = build_incremental_update(objects, base_size, size, trailer, xref_stream=last_xref[1])
+        else:
+            print(f"完整重写合并文件（{reason}）")
+            if APPEND_COUNT_KEY in bundle.trailer:
+                del bundle.trailer[APPEND_COUNT_KEY]
+            if dedup:
+                with profiler.phase("dedup"):
+                    saved = deduplicate_resources(bundle)
+                print(f"去重节省: {saved / (1024 * 1024):.2f} MB")
+            # 临时文件沿用合并文件原有的权限
+            fd, temp_path = create_temp_output(bundle_path)
+            os.close(fd)
+            try:
+                with profiler.phase("final_save"):
+                    save_pdf(bundle, temp_path, save_profile)
+            except BaseException:
+                os.remove(temp_path)
+                raise
+
+    # 合并文件关闭后再写入，Windows 上打开的文件不能被替换
+    if temp_path is not None:
+        os.replace(temp_path, bundle_path)
+        written = os.path.getsize(bundle_path)
+        print(f"合并文件已完整重写: {bundle_path} ({total_pages} 页, 大小: {written / (1024 * 1024):.2f} MB)")
+    else:
+        with profiler.phase("append_write"):
+            write_incremental_update(bundle_path, base_size, update, total_pages)
+        written = len(update)
+        print(f"已追加 {total_pages - old_pages} 页到 {bundle_path} (增量更新 {written / (1024 * 1024):.2f} MB, "
+              f"第 {appends + 1} 次; 文件大小: {os.path.getsize(bundle_path) / (1024 * 1024):.2f} MB)")
+    profiler.count("bytes_written", written)
+    progress.emit("job_finished", kind="append", output=bundle_path, size_bytes=written)
+    return bundle_path
+
+def collect_batch_inputs(patterns):
+    """
+    将目录或通配符展开为PDF文件列表，目录取其中的所有 .pdf 文件，重复的路径只保留一次
+    """
+    paths = []
+    seen = set()
+    for pattern in patterns:
+        if os.path.isdir(pattern):
+            matches = [os.path.join(pattern, name) for name in os.listdir(pattern)
+                       if name.lower().endswith(".pdf")]
+        else:
+            matches = glob.glob(pattern)
+        for pdf_path in sorted(matches):
+            key = os.path.abspath(pdf_path)
+            if os.path.isfile(pdf_path) and key not in seen:
+                seen.add(key)
+                paths.append(pdf_path)
+    return paths
+
+def batch_output_collisions(input_pdf_paths, output_dir):
+    """
+    返回会写出同名文件的输入分组。各部分和检查点日志以输入的文件名（不含扩展名）命名，
+    同一输出目录中文件名相同的输入（例如 a/x.pdf 与 b/x.pdf 输出到同一 -o）会互相覆盖
+    """
+    groups = {}
+    for pdf_path in input_pdf_paths:
+        target_dir = os.path.dirname(pdf_path) if output_dir is None else output_dir
+        base_name = os.path.splitext(os.path.basename(pdf_path))[0]
+        key = (os.path.normcase(os.path.abspath(target_dir)), os.path.normcase(base_name))
+        groups.setdefault(key, []).append(pdf_path)
+    return [paths for paths in groups.values() if len(paths) > 1]
+
+def _split_file_for_batch(input_pdf_path, size_bytes, output_dir, max_size_mb, pages_per_split, size_options, input_mode,
+                          save_profile="default", prune=False, resume=False):
+    """
+    批处理工作进程入口：分割单个文件并返回清单记录，异常被记录而不会向上抛出。
+    size_bytes 为主进程读取的输入文件大小
+    """
+    if output_dir is None:
+        output_dir = os.path.dirname(input_pdf_path)
+    record = {"input": input_pdf_path, "size_bytes": size_bytes}
+    start = time.perf_counter()
+    try:
+        # 逐个部分的输出由主进程汇总为每个文件一行
+        with contextlib.redirect_stdout(None):
+            if max_size_mb:
+                parts = split_pdf_by_size(input_pdf_path, output_dir, max_size_mb, input_mode=input_mode,
+                                          save_profile=save_profile, prune=prune, resume=resume, **size_options)
+            else:
+                parts = split_pdf_by_pages(input_pdf_path, output_dir, pages_per_split, input_mode=input_mode,
+                                           save_profile=save_profile, prune=prune, resume=resume)
+        record["status"] = "ok"
+        record["parts"] = [{"path": path, "size_bytes": size} for path, size in parts]
+    except Exception as e:
+        record["status"] = "failed"
+        record["error"] = f"{type(e).__name__}: {e}"
+        record["parts"] = []
+    record["elapsed_s"] = round(time.perf_counter() - start, 3)
+    return record
+
+def split_batch(input_pdf_paths, output_dir, max_size_mb=None, pages_per_split=None, jobs=1, manifest_path=None,
+                size_options=None, input_mode="default", save_profile="default", prune=False, resume=False,
+                progress=None):
+    """
+    批量分割多个PDF文件。文件按大小从大到小提交到进程池以缩短尾部等待，
+    单个文件失败（包括收集后被删除而无法读取）不会中止整个批次。结束后写出包含各部分路径、大小和耗时的清单。
+    不同输入会在同一输出目录中写出同名文件时，开始前抛出 ValueError。
+    size_options 为按大小分割时传给 split_pdf_by_size 的额外参数，
+    resume 为 True 时每个文件都从各自的检查点日志继续。
+    progress 接收结构化进度事件，每个文件完成时产生 file_split 事件，吞吐量按输入字节数计算
+    """
+    progress = progress or NullProgress()
+    collisions = batch_output_collisions(input_pdf_paths, output_dir)
+    if collisions:
+        groups = "; ".join(", ".join(paths) for paths in collisions)
+        raise ValueError(f"以下文件会在同一输出目录中写出同名的部分文件，请重命名或分别分割: {groups}")
+
+    start = time.perf_counter()
+    # 每个文件只读取一次大小，收集之后被删除或无法读取的文件记录为失败，不提交到进程池
+    sizes = {}
+    unreadable = []
+    for pdf_path in input_pdf_paths:
+        try:
+            sizes[pdf_path] = os.path.getsize(pdf_path)
+        except OSError as e:
+            unreadable.append({"input": pdf_path, "size_bytes": None, "status": "failed",
+                               "error": f"{type(e).__name__}: {e}", "parts": [], "elapsed_s": None})
+    ordered = sorted(sizes, key=sizes.get, reverse=True)
+    records = {}
+
+    def file_done(record):
+        records[record["input"]] = record
+        counter = f"[{len(records)}/{len(input_pdf_paths)}]"
+        if record["status"] == "ok":
+            print(f"{counter} 完成: {record['input']} ({len(record['parts'])} 个部分, {record['elapsed_s']:.2f} 秒)")
+        else:
+            print(f"{counter} 失败: {record['input']} ({record['error']})")
+        progress.emit("file_split", done_bytes=record["size_bytes"] or 0, path=record["input"],
+                      status=record["status"], parts=len(record["parts"]), size_bytes=record["size_bytes"])
+
+    progress.emit("job_started", kind="batch", files=len(input_pdf_paths), total_bytes=sum(sizes.values()))
+    for record in unreadable:
+        file_done(record)
+    with concurrent.futures.ProcessPoolExecutor(max_workers=max(jobs, 1)) as executor:
+        futures = {executor.submit(_split_file_for_batch, pdf_path, sizes[pdf_path], output_dir, max_size_mb,
+                                   pages_per_split, size_options or {}, input_mode, save_profile, prune, resume): pdf_path
+                   for pdf_path in ordered}
+        for future in as_completed(futures):
+            try:
+                record = future.result()
+            except Exception as e:
+                # 工作进程异常退出时只记录该文件失败
+                record = {"input": futures[future], "size_bytes": sizes[futures[future]],
+                          "status": "failed", "error": f"{type(e).__name__}: {e}", "parts": [], "elapsed_s": None}
+            file_done(record)
+
+    files = [records[pdf_path] for pdf_path in input_pdf_paths]
+    failed = sum(1 for record in files if record["status"] != "ok")
+    manifest = {
+        "policy": {"max_size_mb": max_size_mb} if max_size_mb else {"pages_per_split": pages_per_split},
+        "save_profile": save_profile,
+        "prune": prune,
+        "jobs": jobs,
+        "elapsed_s": round(time.perf_counter() - start, 3),
+        "succeeded": len(files) - failed,
+        "failed": failed,
+        "files": files,
+    }
+    if manifest_path:
+        with open(manifest_path, "w", encoding="utf-8") as f:
+            json.dump(manifest, f, indent=2, ensure_ascii=False)
+        print(f"清单文件: {manifest_path}")
+    print(f"批处理完成: 成功 {manifest['succeeded']} 个, 失败 {failed} 个, 用时 {manifest['elapsed_s']:.2f} 秒")
+    progress.emit("job_finished", kind="batch", succeeded=manifest["succeeded"], failed=failed)
+    return manifest
@@ -0,0 +1,431 @@
+import os
+import queue
+import threading
+
+from . import engine as _split
+from .lazy import LazyModule
+
+# 图形界面在 main() 中第一次创建窗口时才导入 tkinter，导入本模块（例如只调用 split_task）不加载它
+tk = LazyModule("tkinter")
+ttk = LazyModule("tkinter.ttk")
+filedialog = LazyModule("tkinter.filedialog")
+messagebox = LazyModule("tkinter.messagebox")
+
+def remove_partial_output(output_paths):
+    """
+    删除取消前已生成的输出文件
+    """
+    for output_path in output_paths:
+        if os.path.exists(output_path):
+            os.remove(output_path)
+
+def split_task(split_func, input_pdf_path, output_dir, value, progress):
+    """
+    用引擎的分割函数（split_pdf_by_pages 或 split_pdf_by_size）分割PDF，返回 (是否成功, 提示信息)。
+    progress 的 cancel_event 被设置时在下一个进度事件处停止，并删除已生成的部分文件和检查点日志
+    """
+    written = []
+
+    def track(record):
+        if record["event"] == "part_written":
+            written.append(record["path"])
+
+    progress.listeners.append(track)
+    try:
+        split_func(input_pdf_path, output_dir, value, input_mode="mmap", progress=progress)
+        return True, "PDF 分割成功。"
+    except _split.JobCancelled:
+        remove_partial_output(written + [_split.split_journal_path(input_pdf_path, output_dir)])
+        return False, "分割已取消，已删除生成的部分文件。"
+    except Exception as e:
+        return False, f"分割失败: {str(e)}"
+
+def merge_task(input_pdf_paths, output_dir, output_file_name, progress):
+    """
+    用引擎的 merge_pdfs 合并多个PDF，返回 (是否成功, 提示信息)。
+    progress 的 cancel_event 被设置时在两个输入文件之间停止，此时尚未写出任何文件
+    """
+    try:
+        output_path = _split.merge_pdfs(input_pdf_paths, output_dir, output_file_name, input_mode="mmap",
+                                        progress=progress)
+    except _split.JobCancelled:
+        return False, "合并已取消。"
+    except Exception as e:
+        return False, f"合并失败: {str(e)}"
+    if output_path is None:
+        # 引擎在合并前检查全部输入，无效时不合并；再次检查以便在对话框中列出原因
+        invalid = _split.validate_merge_inputs(input_pdf_paths, "mmap")
+        details = "\n".join(f"{pdf_path}: {error}" for pdf_path, error in invalid)
+        return False, f"合并失败，存在无效的输入文件:\n{details}"
+    file_size = os.path.getsize(output_path) / (1024 * 1024)  # 转换为MB
+    return True, f"PDF 合并成功。输出文件: {output_path} (大小: {file_size:.2f} MB)"
+
+def format_progress(record):
+    """
+    将进度事件格式化为状态栏文本：已完成页数、吞吐量和预计剩余时间
+    """
+    text = f"已完成 {record['pages_done']} 页, {record['pages_per_s']:.1f} 页/秒, {record['mb_per_s']:.2f} MB/秒"
+    if record["eta_s"] is not None:
+        text += f", 预计剩余 {record['eta_s']:.0f} 秒"
+    return text
+
+class PDFToolGUI:
+    def __init__(self, root):
+        self.root = root
+        self.root.title("PDF 分割与合并工具")
+        self.root.geometry("600x600")
+        # 每个标签页各自的后台任务：结果队列与取消标志
+        self.task_queues = {}
+        self.cancel_events = {}
+        self.create_widgets()
+
+    def create_widgets(self):
+        tab_control = ttk.Notebook(self.root)
+
+        # 分割标签
+        self.split_tab = ttk.Frame(tab_control)
+        tab_control.add(self.split_tab, text='分割 PDF')
+
+        # 合并标签
+        self.merge_tab = ttk.Frame(tab_control)
+        tab_control.add(self.merge_tab, text='合并 PDF')
+
+        tab_control.pack(expand=1, fill="both")
+
+        self.create_split_tab()
+        self.create_merge_tab()
+
+    def create_split_tab(self):
+        # 输入PDF文件选择
+        input_frame = ttk.LabelFrame(self.split_tab, text="输入PDF文件")
+        input_frame.pack(fill="x", padx=10, pady=10)
+
+        self.split_input_path = tk.StringVar()
+        input_entry = ttk.Entry(input_frame, textvariable=self.split_input_path, width=50)
+        input_entry.pack(side="left", padx=5, pady=5)
+
+        browse_button = ttk.Button(input_frame, text="浏览", command=self.browse_split_input)
+        browse_button.pack(side="left", padx=5, pady=5)
+
+        # 分割方式选择
+        method_frame = ttk.LabelFrame(self.split_tab, text="分割方式")
+        method_frame.pack(fill="x", padx=10, pady=10)
+
+        self.split_method = tk.StringVar(value="pages")
+        pages_radio = ttk.Radiobutton(method_frame, text="按页数分割", variable=self.split_method, value="pages", command=self.toggle_split_options)
+        pages_radio.pack(anchor="w", padx=5, pady=2)
+
+        size_radio = ttk.Radiobutton(method_frame, text="按文件大小分割", variable=self.split_method, value="size", command=self.toggle_split_options)
+        size_radio.pack(anchor="w", padx=5, pady=2)
+
+        # 分割参数
+        self.split_options_frame = ttk.Frame(self.split_tab)
+        self.split_options_frame.pack(fill="x", padx=10, pady=10)
+
+        # 按页数分割选项
+        self.pages_label = ttk.Label(self.split_options_frame, text="每个文件的页数:")
+        self.pages_entry = ttk.Entry(self.split_options_frame)
+
+        # 按大小分割选项
+        self.size_label = ttk.Label(self.split_options_frame, text="最大文件大小 (MB):")
+        self.size_entry = ttk.Entry(self.split_options_frame)
+
+        self.toggle_split_options()
+
+        # 输出目录选择
+        output_frame = ttk.LabelFrame(self.split_tab, text="输出目录")
+        output_frame.pack(fill="x", padx=10, pady=10)
+
+        self.split_output_dir = tk.StringVar()
+        output_entry = ttk.Entry(output_frame, textvariable=self.split_output_dir, width=50)
+        output_entry.pack(side="left", padx=5, pady=5)
+
+        browse_output_button = ttk.Button(output_frame, text="浏览", command=self.browse_split_output)
+        browse_output_button.pack(side="left", padx=5, pady=5)
+
+        # 分割与取消按钮
+        split_button_frame = ttk.Frame(self.split_tab)
+        split_button_frame.pack(pady=10)
+
+        self.split_button = ttk.Button(split_button_frame, text="开始分割", command=self.start_split)
+        self.split_button.pack(side="left", padx=5)
+
+        self.split_cancel_button = ttk.Button(split_button_frame, text="取消", command=lambda: self.cancel_task("split"), state="disabled")
+        self.split_cancel_button.pack(side="left", padx=5)
+
+        # 进度条
+        self.split_progress = ttk.Progressbar(self.split_tab, orient='horizontal', mode='determinate', length=580)
+        self.split_progress.pack(padx=10, pady=10)
+
+        # 状态信息
+        self.split_status = tk.StringVar()
+        split_status_label = ttk.Label(self.split_tab, textvariable=self.split_status, foreground="blue")
+        split_status_label.pack(padx=10, pady=5)
+
+    def create_merge_tab(self):
+        # 输入PDF文件选择
+        input_frame = ttk.LabelFrame(self.merge_tab, text="输入PDF文件")
+        input_frame.pack(fill="both", padx=10, pady=10, expand=True)
+
+        self.merge_input_paths = tk.Variable(value=[])
+        self.merge_listbox = tk.Listbox(input_frame, listvariable=self.merge_input_paths, selectmode='multiple', width=50, height=10)
+        self.merge_listbox.pack(side="left", padx=5, pady=5, expand=True, fill="both")
+
+        scrollbar = ttk.Scrollbar(input_frame, orient="vertical", command=self.merge_listbox.yview)
+        scrollbar.pack(side="left", fill="y")
+        self.merge_listbox.config(yscrollcommand=scrollbar.set)
+
+        add_button = ttk.Button(input_frame, text="添加文件", command=self.add_merge_files)
+        add_button.pack(side="left", padx=5, pady=5)
+
+        remove_button = ttk.Button(input_frame, text="移除选中", command=self.remove_merge_files)
+        remove_button.pack(side="left", padx=5, pady=5)
+
+        # 输出文件名
+        filename_frame = ttk.LabelFrame(self.merge_tab, text="输出文件名 (可选)")
+        filename_frame.pack(fill="x", padx=10, pady=10)
+
+        self.merge_output_filename = tk.StringVar()
+        filename_entry = ttk.Entry(filename_frame, textvariable=self.merge_output_filename, width=50)
+        filename_entry.pack(side="left", padx=5, pady=5)
+
+        # 输出目录选择
+        output_frame = ttk.LabelFrame(self.merge_tab, text="输出目录")
+        output_frame.pack(fill="x", padx=10, pady=10)
+
+        self.merge_output_dir = tk.StringVar()
+        output_entry = ttk.Entry(output_frame, textvariable=self.merge_output_dir, width=50)
+        output_entry.pack(side="left", padx=5, pady=5)
+
+        browse_output_button = ttk.Button(output_frame, text="浏览", command=self.browse_merge_output)
+        browse_output_button.pack(side="left", padx=5, pady=5)
+
+        # 合并与取消按钮
+        merge_button_frame = ttk.Frame(self.merge_tab)
+        merge_button_frame.pack(pady=10)
+
+        self.merge_button = ttk.Button(merge_button_frame, text="开始合并", command=self.start_merge)
+        self.merge_button.pack(side="left", padx=5)
+
+        self.merge_cancel_button = ttk.Button(merge_button_frame, text="取消", command=lambda: self.cancel_task("merge"), state="disabled")
+        self.merge_cancel_button.pack(side="left", padx=5)
+
+        # 进度条
+        self.merge_progress = ttk.Progressbar(self.merge_tab, orient='horizontal', mode='determinate', length=580)
+        self.merge_progress.pack(padx=10, pady=10)
+
+        # 状态信息
+        self.merge_status = tk.StringVar()
+        merge_status_label = ttk.Label(self.merge_tab, textvariable=self.merge_status, foreground="blue")
+        merge_status_label.pack(padx=10, pady=5)
+
+    def browse_split_input(self):
+        file_path = filedialog.askopenfilename(title="选择PDF文件", filetypes=[("PDF Files", "*.pdf")])
+        if file_path:
+            self.split_input_path.set(file_path)
+
+    def browse_split_output(self):
+        directory = filedialog.askdirectory(title="选择输出目录")
+        if directory:
+            self.split_output_dir.set(directory)
+
+    def browse_merge_output(self):
+        directory = filedialog.askdirectory(title="选择输出目录")
+        if directory:
+            self.merge_output_dir.set(directory)
+
+    def add_merge_files(self):
+        files = filedialog.askopenfilenames(title="选择PDF文件", filetypes=[("PDF Files", "*.pdf")])
+        current_files = list(self.merge_listbox.get(0, tk.END))
+        for file in files:
+            if file not in current_files:
+                self.merge_listbox.insert(tk.END, file)
+
+    def remove_merge_files(self):
+        selected_indices = self.merge_listbox.curselection()
+        for index in reversed(selected_indices):
+            self.merge_listbox.delete(index)
+
+    def toggle_split_options(self):
+        for widget in self.split_options_frame.winfo_children():
+            widget.pack_forget()
+
+        if self.split_method.get() == "pages":
+            self.pages_label.pack(anchor="w", padx=5, pady=2)
+            self.pages_entry.pack(anchor="w", padx=5, pady=2)
+        else:
+            self.size_label.pack(anchor="w", padx=5, pady=2)
+            self.size_entry.pack(anchor="w", padx=5, pady=2)
+
+    def start_split(self):
+        input_pdf = self.split_input_path.get()
+        output_dir = self.split_output_dir.get()
+
+        if not input_pdf:
+            messagebox.showwarning("输入文件缺失", "请选择要分割的PDF文件。")
+            return
+        if not os.path.exists(input_pdf):
+            messagebox.showerror("文件不存在", "选择的PDF文件不存在。")
+            return
+        if not output_dir:
+            messagebox.showwarning("输出目录缺失", "请选择输出目录。")
+            return
+        if not os.path.exists(output_dir):
+            os.makedirs(output_dir)
+
+        method = self.split_method.get()
+        if method == "pages":
+            try:
+                pages = int(self.pages_entry.get())
+                if pages <= 0:
+                    raise ValueError
+            except ValueError:
+                messagebox.showerror("无效输入", "每个文件的页数必须是一个正整数。")
+                return
+            split_args = (_split.split_pdf_by_pages, input_pdf, output_dir, pages)
+        else:
+            try:
+                size = float(self.size_entry.get())
+                if size <= 0:
+                    raise ValueError
+            except ValueError:
+                messagebox.showerror("无效输入", "最大文件大小必须是一个正数。")
+                return
+            split_args = (_split.split_pdf_by_size, input_pdf, output_dir, size)
+
+        # 重置进度条和状态
+        self.split_progress['value'] = 0
+        self.split_status.set("正在分割...")
+
+        # 在后台执行分割
+        self.run_task("split", split_task, split_args)
+
+    def reset_split_fields(self):
+        """
+        重置分割标签页的输入字段和进度条
+        """
+        # 清除输入PDF路径
+        self.split_input_path.set("")
+        # 清除分割参数
+        if self.split_method.get() == "pages":
+            self.pages_entry.delete(0, tk.END)
+        else:
+            self.size_entry.delete(0, tk.END)
+        # 重置进度条
+        self.split_progress['value'] = 0
+        # 清除状态信息
+        self.split_status.set("")
+
+    def start_merge(self):
+        input_pdfs = list(self.merge_listbox.get(0, tk.END))
+        output_dir = self.merge_output_dir.get()
+        output_file_name = self.merge_output_filename.get()
+
+        if not input_pdfs:
+            messagebox.showwarning("输入文件缺失", "请添加要合并的PDF文件。")
+            return
+        if not output_dir:
+            messagebox.showwarning("输出目录缺失", "请选择输出目录。")
+            return
+        if not os.path.exists(output_dir):
+            os.makedirs(output_dir)
+
+        merge_args = (input_pdfs, output_dir, output_file_name if output_file_name else None)
+
+        # 重置进度条和状态
+        self.merge_progress['value'] = 0
+        self.merge_status.set("正在合并...")
+
+        # 在后台执行合并
+        self.run_task("merge", merge_task, merge_args)
+
+    def reset_merge_fields(self):
+        """
+        重置合并标签页的输入字段和进度条
+        """
+        # 清除输出文件名
+        self.merge_output_filename.set("")
+        # 重置进度条
+        self.merge_progress['value'] = 0
+        # 清除状态信息
+        self.merge_status.set("")
+
+    def task_widgets(self, kind):
+        """
+        返回指定任务对应的 (开始按钮, 取消按钮, 进度条, 状态变量, 重置方法)
+        """
+        if kind == "split":
+            return self.split_button, self.split_cancel_button, self.split_progress, self.split_status, self.reset_split_fields
+        return self.merge_button, self.merge_cancel_button, self.merge_progress, self.merge_status, self.reset_merge_fields
+
+    def run_task(self, kind, func, args):
+        """
+        在后台线程中运行分割或合并，进度和结果通过队列交回主线程，由 root.after 轮询处理
+        """
+        start_button, cancel_button, _, _, _ = self.task_widgets(kind)
+        start_button.config(state="disabled")
+        cancel_button.config(state="normal")
+
+        task_queue = queue.Queue()
+        cancel_event = threading.Event()
+        self.task_queues[kind] = task_queue
+        self.cancel_events[kind] = cancel_event
+
+        def worker():
+            # 进度事件在后台线程中产生，通过队列交给主线程更新界面；取消后引擎在下一个事件处停止
+            progress = _split.Progress(lambda record: task_queue.put(("progress", record)), cancel_event=cancel_event)
+            success, message = func(*args, progress)
+            task_queue.put(("done", success, message))
+
+        threading.Thread(target=worker, daemon=True).start()
+        self.root.after(100, self.poll_task, kind)
+
+    def poll_task(self, kind):
+        """
+        处理后台任务发回的进度与结果，任务未结束时继续轮询
+        """
+        start_button, cancel_button, progress, status, reset_fields = self.task_widgets(kind)
+        task_queue = self.task_queues[kind]
+        while True:
+            try:
+                item = task_queue.get_nowait()
+            except queue.Empty:
+                self.root.after(100, self.poll_task, kind)
+                return
+
+            if item[0] == "progress":
+                record = item[1]
+                if record["percent"] is not None:
+                    progress['value'] = record["percent"]
+                if record["event"] in ("part_written", "file_merged"):
+                    status.set(format_progress(record))
+                continue
+
+            _, success, message = item
+            start_button.config(state="normal")
+            cancel_button.config(state="disabled")
+            status.set(message)
+            if success:
+                messagebox.showinfo("成功", message)
+                reset_fields()
+            elif self.cancel_events[kind].is_set():
+                progress['value'] = 0
+                messagebox.showinfo("已取消", message)
+            else:
+                messagebox.showerror("失败", message)
+            return
+
+    def cancel_task(self, kind):
+        """
+        请求取消后台任务，任务在下一个进度事件处停止
+        """
+        if kind in self.cancel_events:
+            self.cancel_events[kind].set()
+            _, cancel_button, _, status, _ = self.task_widgets(kind)
+            cancel_button.config(state="disabled")
+            status.set("正在取消...")
+
+def main():
+    root = tk.Tk()
+    PDFToolGUI(root)
+    root.mainloop()
@@ -0,0 +1,33 @@
+import importlib
+import threading
+
+class LazyModule:
+    """
+    第一次访问属性时才导入的模块，用于推迟导入 pikepdf、tkinter 等耗时的依赖：
+    只查看帮助、参数有误或只读取选项的调用不必为它们付出导入时间。
+    访问过的属性缓存在实例上，之后的访问与直接使用模块相同
+    """
+    def __init__(self, name):
+        self.__dict__["_name"] = name
+        self.__dict__["_module"] = None
+        self.__dict__["_lock"] = threading.Lock()
+
+    def _load(self):
+        with self._lock:
+            if self._module is None:
+                self.__dict__["_module"] = importlib.import_module(self._name)
+        return self._module
+
+    def __getattr__(self, attr):
+        value = getattr(self._load(), attr)
+        self.__dict__[attr] = value
+        return value
+
+    def __setattr__(self, attr, value):
+        # 修改模块属性（例如测试中替换函数）时作用于真正的模块
+        setattr(self._load(), attr, value)
+        self.__dict__.pop(attr, None)
+
+    def __repr__(self):
+        state = "已导入" if self._module is not None else "未导入"
+        return f"<LazyModule {self._name} ({state})>"
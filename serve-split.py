@@ -0,0 +1,279 @@
+import os
+import re
+import sys
+import json
+import time
+import signal
+import argparse
+import threading
+import contextlib
+import socketserver
+import importlib
+import multiprocessing
+from io import StringIO
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+# 请求体大小上限，作业参数只包含路径和选项
+MAX_BODY_BYTES = 1024 * 1024
+
+# 允许的 Host 请求头：只接受本机名称，防止其他网页通过浏览器或 DNS 重绑定向服务提交作业
+LOCAL_HOST_PATTERN = re.compile(r"^(localhost|127\.0\.0\.1|\[::1\])(:\d+)?$", re.IGNORECASE)
+
+# 工作进程中已加载的引擎模块，每个进程只在启动时导入一次 pikepdf
+_split = None
+
+def _init_worker():
+    global _split
+    _split = importlib.import_module("pdfsplit.engine")
+    # 引擎在第一次用到 pikepdf 时才导入它，常驻的工作进程在启动时预先导入，第一个作业不必等待
+    importlib.import_module("pikepdf")
+
+def _ping():
+    return os.getpid()
+
+def _run_split(params):
+    input_pdf = params["input"]
+    if not os.path.isfile(input_pdf):
+        raise FileNotFoundError(f"输入的PDF文件不存在: {input_pdf}")
+    output_dir = params.get("output_dir") or os.path.dirname(input_pdf)
+    os.makedirs(output_dir, exist_ok=True)
+    options = {"input_mode": params.get("input_mode", "default"),
+               "save_profile": params.get("save_profile", "default"),
+               "prune": bool(params.get("prune")),
+               "resume": bool(params.get("resume"))}
+
+    if params.get("ranges") or params.get("bookmarks"):
+        parts = _split.split_pdf_by_ranges(input_pdf, output_dir, params.get("ranges"),
+                                           by_outline=bool(params.get("bookmarks")), **options)
+    elif params.get("parts"):
+        parts = _split.split_pdf_into_parts(input_pdf, output_dir, int(params["parts"]),
+                                            balance=params.get("balance", "size"), **options)
+    elif params.get("max_size_mb"):
+        parts = _split.split_pdf_by_size(input_pdf, output_dir, float(params["max_size_mb"]),
+                                         use_cache=params.get("use_cache", True), **options)
+    elif params.get("pages_per_split"):
+        parts = _split.split_pdf_by_pages(input_pdf, output_dir, int(params["pages_per_split"]), **options)
+    else:
+        raise ValueError("请提供分割方式：pages_per_split、max_size_mb、parts、ranges 或 bookmarks")
+    return {"parts": [{"path": path, "size_bytes": size} for path, size in parts]}
+
+def _run_merge(params):
+    input_pdfs = params["inputs"]
+    if not isinstance(input_pdfs, list) or len(input_pdfs) < 2:
+        raise ValueError("合并操作需要至少两个PDF文件")
+    output_dir = params.get("output_dir") or os.path.dirname(input_pdfs[0])
+    filename = params.get("filename")
+    # 文件名只能是 output_dir 中的文件名，不能带目录或 ..
+    if filename is not None and (not isinstance(filename, str) or os.path.basename(filename) != filename
+                                 or filename in ("", ".", "..")):
+        raise ValueError(f"输出文件名不能包含路径: {filename}")
+    os.makedirs(output_dir, exist_ok=True)
+    options = {"dedup": bool(params.get("dedup")),
+               "input_mode": params.get("input_mode", "default"),
+               "save_profile": params.get("save_profile", "default"),
+               "prefetch": int(params.get("prefetch", 4))}
+
+    # 引擎把无效的输入逐个输出后返回 None，这些输出作为错误信息返回给调用方
+    with contextlib.redirect_stdout(StringIO()) as log:
+        if params.get("stream"):
+            output_path = _split.merge_pdfs_streaming(input_pdfs, output_dir, filename,
+                                                      memory_budget_mb=float(params.get("memory_budget_mb", 256)),
+                                                      max_open_files=int(params.get("max_open_files", 64)),
+                                                      resume=bool(params.get("resume")), **options)
+        else:
+            output_path = _split.merge_pdfs(input_pdfs, output_dir, filename, **options)
+    if output_path is None:
+        raise ValueError(log.getvalue().strip())
+    return {"output": {"path": output_path, "size_bytes": os.path.getsize(output_path)}}
+
+def run_job(kind, params):
+    """
+    在工作进程中执行一个分割或合并作业，返回可序列化为 JSON 的结果。
+    引擎的逐个部分输出不写到服务的终端
+    """
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(StringIO()):
+        result = _run_split(params) if kind == "split" else _run_merge(params)
+    result["elapsed_s"] = round(time.perf_counter() - start, 3)
+    return result
+
+class QueueFull(Exception):
+    """
+    正在执行和排队的作业数已达上限
+    """
+
+class SplitService:
+    """
+    常驻的作业服务：启动时预先创建工作进程并导入 pikepdf，之后每个作业直接交给空闲的工作进程。
+    正在执行与排队的作业总数不超过 workers + max_queue，超出时立即拒绝，由调用方稍后重试
+    """
+    def __init__(self, workers, max_queue):
+        self.workers = workers
+        self.max_queue = max_queue
+        self.slots = threading.BoundedSemaphore(workers + max_queue)
+        self.lock = threading.Lock()
+        self.active = 0
+        self.completed = 0
+        self.executor = self._start_pool()
+
+    def _start_pool(self):
+        # 服务进程中有多个请求线程，工作进程用 spawn 启动，不继承线程和锁的状态
+        executor = ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker,
+                                       mp_context=multiprocessing.get_context("spawn"))
+        # 同时提交与进程数相同的任务，使所有工作进程立即启动并完成导入
+        for future in [executor.submit(_ping) for _ in range(self.workers)]:
+            future.result()
+        return executor
+
+    def run(self, kind, params):
+        """
+        执行一个作业并等待结果。队列已满时抛出 QueueFull
+        """
+        if not self.slots.acquire(blocking=False):
+            raise QueueFull()
+        with self.lock:
+            self.active += 1
+        try:
+            executor = self.executor
+            try:
+                return executor.submit(run_job, kind, params).result()
+            except BrokenProcessPool:
+                # 工作进程异常退出（例如内存不足被杀死）后进程池不可再用，重建后继续服务
+                with self.lock:
+                    if self.executor is executor:
+                        self.executor = self._start_pool()
+                        executor.shutdown(wait=False)
+                raise
+        finally:
+            with self.lock:
+                self.active -= 1
+                self.completed += 1
+            self.slots.release()
+
+    def status(self):
+        with self.lock:
+            return {"workers": self.workers, "max_queue": self.max_queue,
+                    "active": self.active, "completed": self.completed}
+
+    def close(self):
+        self.executor.shutdown(wait=True, cancel_futures=True)
+
+class RequestHandler(BaseHTTPRequestHandler):
+    """
+    GET /health 返回服务状态；POST /split 和 POST /merge 接收 JSON 作业参数，完成后返回各部分的路径和大小
+    """
+    server_version = "pdf-split"
+    protocol_version = "HTTP/1.1"
+    timeout = 60  # 读取请求的超时时间，不限制作业本身的执行时间
+
+    def address_string(self):
+        # Unix 套接字没有客户端地址
+        return self.client_address[0] if self.client_address else "unix"
+
+    def send_json(self, status, payload, headers=None):
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.path == "/health":
+            self.send_json(200, self.server.service.status())
+        else:
+            self.send_json(404, {"error": f"未知路径: {self.path}"})
+
+    def do_POST(self):
+        kind = {"/split": "split", "/merge": "merge"}.get(self.path)
+        if kind is None:
+            self.send_json(404, {"error": f"未知路径: {self.path}"})
+            return
+        # 浏览器对 text/plain 等简单请求不做 CORS 预检，只接受 JSON 请求并检查 Host，其他网页就无法提交作业。
+        # Unix 套接字不能从浏览器访问，不检查 Host
+        host = self.headers.get("Host", "")
+        if self.client_address and not LOCAL_HOST_PATTERN.match(host):
+            self.close_connection = True
+            self.send_json(403, {"error": f"不接受的 Host: {host}"})
+            return
+        content_type = self.headers.get("Content-Type", "").split(";")[0].strip().lower()
+        if content_type != "application/json":
+            self.close_connection = True
+            self.send_json(415, {"error": "请求体必须是 application/json"})
+            return
+        length = int(self.headers.get("Content-Length") or 0)
+        if length > MAX_BODY_BYTES:
+            self.close_connection = True
+            self.send_json(413, {"error": "请求体过大"})
+            return
+        try:
+            params = json.loads(self.rfile.read(length) or b"{}")
+        except ValueError:
+            self.send_json(400, {"error": "请求体不是有效的 JSON"})
+            return
+        if not isinstance(params, dict) or ("input" if kind == "split" else "inputs") not in params:
+            self.send_json(400, {"error": "分割需要 input 参数，合并需要 inputs 参数"})
+            return
+
+        try:
+            result = self.server.service.run(kind, params)
+        except QueueFull:
+            self.send_json(503, {"error": "作业队列已满，请稍后重试"}, {"Retry-After": "1"})
+        except (ValueError, TypeError, KeyError, FileNotFoundError) as e:
+            self.send_json(400, {"error": f"{type(e).__name__}: {e}"})
+        except Exception as e:
+            self.send_json(500, {"error": f"{type(e).__name__}: {e}"})
+        else:
+            self.send_json(200, result)
+
+class ThreadingUnixHTTPServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+def create_server(service, host="127.0.0.1", port=8765, unix_socket=None):
+    """
+    创建 HTTP 服务，指定 unix_socket 时监听 Unix 套接字（只有当前用户可访问），否则监听 host:port
+    """
+    if unix_socket:
+        if os.path.exists(unix_socket):
+            os.remove(unix_socket)  # 上次异常退出留下的套接字文件
+        server = ThreadingUnixHTTPServer(unix_socket, RequestHandler)
+        os.chmod(unix_socket, 0o600)
+    else:
+        server = ThreadingHTTPServer((host, port), RequestHandler)
+        server.daemon_threads = True
+    server.service = service
+    return server
+
+def main():
+    parser = argparse.ArgumentParser(description="PDF分割与合并常驻服务")
+    parser.add_argument("--host", default="127.0.0.1", help="HTTP 监听地址，默认为 127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765, help="HTTP 监听端口，默认为8765")
+    parser.add_argument("--unix-socket", default=None, help="改为监听指定的 Unix 套接字文件")
+    parser.add_argument("-w", "--workers", type=int, default=os.cpu_count() or 1, help="常驻工作进程数，默认为CPU核数")
+    parser.add_argument("--max-queue", type=int, default=16, help="所有工作进程都忙时最多排队的作业数，超出时返回503，默认为16")
+
+    args = parser.parse_args()
+
+    service = SplitService(max(args.workers, 1), max(args.max_queue, 0))
+    server = create_server(service, args.host, args.port, args.unix_socket)
+    address = args.unix_socket or f"http://{args.host}:{server.server_address[1]}"
+    print(f"服务已启动: {address} ({service.workers} 个工作进程, 队列上限 {service.max_queue})", file=sys.stderr)
+
+    # SIGTERM 与 Ctrl+C 一样正常退出，等待正在执行的作业完成
+    signal.signal(signal.SIGTERM, lambda signum, frame: threading.Thread(target=server.shutdown).start())
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        service.close()
+        if args.unix_socket and os.path.exists(args.unix_socket):
+            os.remove(args.unix_socket)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,2 @@
+# 兼容旧的导入方式：异步接口已移到 pdfsplit.aio
+from pdfsplit.aio import AsyncSplitEngine, JobCancelled, iter_parts, merge, split
@@ -0,0 +1,127 @@
+import os
+
+import pikepdf
+import pytest
+
+from pdfsplit import engine
+
+# 所有输入共用的字体和图片数据，用于检查跨批次去重
+FONT = {"Type": pikepdf.Name.Font, "Subtype": pikepdf.Name.Type1, "BaseFont": pikepdf.Name.Helvetica}
+IMAGE_DATA = bytes(range(256)) * 16
+
+def make_pdf(path, label, pages=3):
+    """
+    生成测试输入：每页有各自的内容流，共用一个字体和一张图片，引用一个带软蒙版的图片
+    和一个表单 XObject（二者都引用其他对象），并有一个链接到本文件第一页的注释
+    """
+    pdf = pikepdf.new()
+    font = pdf.make_indirect(pikepdf.Dictionary(**FONT))
+    image = pikepdf.Stream(pdf, IMAGE_DATA, Type=pikepdf.Name.XObject, Subtype=pikepdf.Name.Image,
+                           Width=64, Height=64, ColorSpace=pikepdf.Name.DeviceGray, BitsPerComponent=8)
+    mask = pikepdf.Stream(pdf, label.encode() * 64, Type=pikepdf.Name.XObject, Subtype=pikepdf.Name.Image,
+                          Width=len(label), Height=64, ColorSpace=pikepdf.Name.DeviceGray, BitsPerComponent=8)
+    masked = pikepdf.Stream(pdf, label.encode() * 64, Type=pikepdf.Name.XObject, Subtype=pikepdf.Name.Image,
+                            Width=len(label), Height=64, ColorSpace=pikepdf.Name.DeviceGray, BitsPerComponent=8,
+                            SMask=pdf.make_indirect(mask))
+    form = pikepdf.Stream(pdf, f"BT /F1 8 Tf ({label} form) Tj ET".encode(), Type=pikepdf.Name.XObject,
+                          Subtype=pikepdf.Name.Form, BBox=[0, 0, 100, 100],
+                          Resources=pikepdf.Dictionary(Font=pikepdf.Dictionary(F1=font)))
+    resources = pikepdf.Dictionary(Font=pikepdf.Dictionary(F1=font),
+                                   XObject=pikepdf.Dictionary(Im1=pdf.make_indirect(image),
+                                                              Im2=pdf.make_indirect(masked),
+                                                              Fm1=pdf.make_indirect(form)))
+    for number in range(pages):
+        content = f"BT /F1 12 Tf 72 720 Td ({label} {number}) Tj ET /Im1 Do /Im2 Do /Fm1 Do".encode()
+        page = pikepdf.Dictionary(Type=pikepdf.Name.Page, MediaBox=[0, 0, 612, 792], Resources=resources,
+                                  Contents=pdf.make_indirect(pikepdf.Stream(pdf, content)))
+        pdf.pages.append(pikepdf.Page(page))
+    link = pikepdf.Dictionary(Type=pikepdf.Name.Annot, Subtype=pikepdf.Name.Link, Rect=[0, 0, 10, 10],
+                              Dest=[pdf.pages[0].obj, pikepdf.Name.Fit])
+    pdf.pages[-1].Annots = pdf.make_indirect(pikepdf.Array([pdf.make_indirect(link)]))
+    pdf.save(path)
+    return str(path)
+
+def page_summary(path):
+    """
+    每页的内容流、所用图片和表单的解码数据，以及链接目标页的序号
+    """
+    with pikepdf.open(path) as pdf:
+        assert not pdf.get_warnings()
+        assert not pdf.check_pdf_syntax()
+        summary = []
+        for page in pdf.pages:
+            xobjects = page.Resources.XObject
+            entry = [page.Contents.read_bytes(), xobjects.Im1.read_bytes(), xobjects.Im2.read_bytes(),
+                     xobjects.Im2.SMask.read_bytes(), xobjects.Fm1.read_bytes()]
+            if "/Annots" in page:
+                entry.append(pdf.pages.index(pikepdf.Page(page.Annots[0].Dest[0])))
+            summary.append(entry)
+        return summary
+
+@pytest.fixture
+def inputs(tmp_path):
+    return [make_pdf(tmp_path / f"in{k}.pdf", f"doc{k}") for k in range(5)]
+
+@pytest.mark.parametrize("dedup", [False, True])
+def test_streaming_merge_matches_merge(tmp_path, inputs, dedup):
+    expected = engine.merge_pdfs(inputs, str(tmp_path), "plain.pdf", dedup=dedup)
+    # 每批最多两个文件，五个输入分为三批，经 StreamingPdfWriter 写出
+    output = engine.merge_pdfs_streaming(inputs, str(tmp_path), "stream.pdf", max_open_files=2, dedup=dedup)
+
+    assert engine.plan_merge_batches(inputs, 256, 2) == [inputs[:2], inputs[2:4], inputs[4:]]
+    summary = page_summary(output)
+    assert len(summary) == 15
+    assert summary == page_summary(expected)
+    assert not os.path.exists(tmp_path / ".stream.pdf.merge-spill")
+
+def test_streaming_merge_dedups_leaf_objects_across_batches(tmp_path, inputs):
+    plain = engine.merge_pdfs_streaming(inputs, str(tmp_path), "plain.pdf", max_open_files=2)
+    deduped = engine.merge_pdfs_streaming(inputs, str(tmp_path), "dedup.pdf", max_open_files=2, dedup=True)
+
+    with pikepdf.open(plain) as pdf_plain, pikepdf.open(deduped) as pdf_dedup:
+        def shared(pdf):
+            return {(page.Resources.Font.F1.objgen, page.Resources.XObject.Im1.objgen) for page in pdf.pages}
+        # 共用的字体和图片不引用其他对象，去重后整个文件只剩一份；不去重时每个输入各一份
+        assert len(shared(pdf_plain)) == 5
+        assert len(shared(pdf_dedup)) == 1
+        assert len(pdf_dedup.objects) < len(pdf_plain.objects)
+
+def read_bytes(path):
+    with open(path, "rb") as f:
+        return f.read()
+
+@pytest.mark.parametrize("save_profile", ["default", "compact"])
+def test_append_matches_merge(tmp_path, inputs, save_profile):
+    # compact 生成对象流，合并文件以交叉引用流结尾，增量更新也写为交叉引用流
+    bundle = engine.merge_pdfs(inputs[:2], str(tmp_path), "bundle.pdf", save_profile=save_profile)
+    assert engine.find_last_xref(bundle)[1] == (save_profile == "compact")
+
+    for appends, end in ((1, 3), (2, 4)):
+        before = read_bytes(bundle)
+        last_xref = engine.find_last_xref(bundle)[0]
+        engine.append_pdfs(bundle, [inputs[end - 1]], rewrite_every=2)
+
+        # 增量更新只在末尾追加，原有内容不变，新的尾部字典通过 /Prev 指向上一个交叉引用节
+        assert read_bytes(bundle).startswith(before)
+        with pikepdf.open(bundle) as pdf:
+            assert int(pdf.trailer[engine.APPEND_COUNT_KEY]) == appends
+            assert int(pdf.trailer.Prev) == last_xref
+        expected = engine.merge_pdfs(inputs[:end], str(tmp_path), f"expected{end}.pdf")
+        assert page_summary(bundle) == page_summary(expected)
+
+    # 已有两次增量更新，第三次追加时完整重写，丢弃历次交叉引用节
+    engine.append_pdfs(bundle, [inputs[4]], rewrite_every=2)
+    with pikepdf.open(bundle) as pdf:
+        assert engine.APPEND_COUNT_KEY not in pdf.trailer
+        assert "/Prev" not in pdf.trailer
+    assert read_bytes(bundle).count(b"%%EOF") == 1
+    expected = engine.merge_pdfs(inputs, str(tmp_path), "expected.pdf")
+    assert page_summary(bundle) == page_summary(expected)
+
+def test_failed_incremental_update_truncates(tmp_path, inputs):
+    bundle = engine.merge_pdfs(inputs[:2], str(tmp_path), "bundle.pdf")
+    before = read_bytes(bundle)
+    # 核对页数不一致时截断回原来的长度
+    with pytest.raises(ValueError):
+        engine.write_incremental_update(bundle, len(before), b"\n% garbage\n", expected_pages=7)
+    assert read_bytes(bundle) == before